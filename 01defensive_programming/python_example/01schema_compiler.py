@@ -0,0 +1,219 @@
+
+# Declarative Schema Compiler: validate_user_profile and validate_new_user in
+# 01input_validation.py hand-code a chain of isinstance, key-presence and range
+# checks, re-check keys one at a time and stop at the first failure.
+# Here the rules are written down once as a schema and compiled into a tree of
+# closures. Each closure only contains the checks its field actually needs, so
+# there is no per-field dispatch on the schema at run time.
+
+import importlib
+import re
+
+# Module names starting with a digit cannot be imported with a plain import statement
+validation_engine = importlib.import_module("01validation_engine")
+
+
+# Example #1: The schema
+# A field spec is a dict with:
+#   type      - expected Python type (checked with isinstance)
+#   required  - defaults to True
+#   pattern   - regex the string value must match
+#   min, max  - inclusive range for numbers
+#   min_len   - minimum length for strings and lists
+#   check     - extra predicate, called only after the type check passed
+#   fields    - nested field specs for a dict
+#   items     - spec applied to every element of a list
+
+ADDRESS_SCHEMA = {
+    "type": dict,
+    "fields": {
+        "street": {"type": str, "min_len": 1},
+        "city": {"type": str, "min_len": 1},
+        "state": {"type": str, "pattern": r'^[A-Z]{2}$'},
+        "zip_code": {"type": str, "pattern": r'^\d{5}$'},
+    },
+}
+
+USER_PROFILE_SCHEMA = {
+    "type": dict,
+    "fields": {
+        "username": {"type": str, "check": validation_engine.is_valid_username},
+        "password": {"type": str, "check": validation_engine.is_valid_password},
+        "email": {"type": str, "check": validation_engine.is_valid_email},
+        "age": {"type": int, "min": 18, "max": 100},
+        "addresses": {"type": list, "items": ADDRESS_SCHEMA},
+        "social_media": {
+            "type": dict,
+            "required": False,
+            "fields": {
+                "facebook": {"type": str, "required": False,
+                             "pattern": r'^(https?:\/\/)?(www\.)?facebook\.com\/[a-zA-Z0-9(\.\?)?]'},
+                "twitter": {"type": str, "required": False,
+                            "pattern": r'^(https?:\/\/)?(www\.)?twitter\.com\/[a-zA-Z0-9(\.\?)?]'},
+            },
+        },
+    },
+}
+
+
+# Example #2: Compiling a spec into closures
+# Every compiled node has the signature check(value, path, errors). It reports
+# problems by calling errors.append(message) and never looks at the spec again.
+# The root value has an empty path; its messages are labelled ROOT instead.
+
+ROOT = "record"
+
+def _compile_node(spec):
+    expected_type = spec["type"]
+    checks = []
+
+    if "pattern" in spec:
+        match = re.compile(spec["pattern"]).match
+        checks.append(lambda value, path, errors:
+                      match(value) is None and errors.append(f"{path or ROOT}: invalid format"))
+    if "min_len" in spec:
+        min_len = spec["min_len"]
+        checks.append(lambda value, path, errors:
+                      len(value) < min_len and errors.append(f"{path or ROOT}: must have at least {min_len} characters"))
+    if "min" in spec or "max" in spec:
+        low = spec.get("min", float("-inf"))
+        high = spec.get("max", float("inf"))
+        checks.append(lambda value, path, errors:
+                      not low <= value <= high and errors.append(f"{path or ROOT}: must be between {low} and {high}"))
+    if "check" in spec:
+        predicate = spec["check"]
+        checks.append(lambda value, path, errors:
+                      not predicate(value) and errors.append(f"{path or ROOT}: invalid value"))
+    if "fields" in spec:
+        checks.append(_compile_fields(spec["fields"]))
+    if "items" in spec:
+        checks.append(_compile_items(spec["items"]))
+
+    type_name = expected_type.__name__
+
+    if len(checks) == 1:
+        only_check = checks[0]
+
+        def check_node(value, path, errors):
+            if not isinstance(value, expected_type):
+                errors.append(f"{path or ROOT}: must be of type {type_name}")
+            else:
+                only_check(value, path, errors)
+    else:
+        checks = tuple(checks)
+
+        def check_node(value, path, errors):
+            if not isinstance(value, expected_type):
+                errors.append(f"{path or ROOT}: must be of type {type_name}")
+                return
+            for check in checks:
+                check(value, path, errors)
+
+    return check_node
+
+
+def _compile_fields(fields):
+    compiled = tuple(
+        (key, spec.get("required", True), _compile_node(spec))
+        for key, spec in fields.items()
+    )
+
+    def check_fields(value, path, errors):
+        prefix = f"{path}." if path else ""
+        for key, required, check in compiled:
+            if key in value:
+                check(value[key], prefix + key, errors)
+            elif required:
+                errors.append(f"{prefix}{key}: missing required field")
+
+    return check_fields
+
+
+def _compile_items(spec):
+    check_item = _compile_node(spec)
+
+    def check_items(value, path, errors):
+        for index, item in enumerate(value):
+            check_item(item, f"{path}[{index}]", errors)
+
+    return check_items
+
+
+# Example #3: Fail-fast and collect-all modes
+# Both modes share the same compiled tree. Fail-fast hands the tree an error sink
+# whose append raises, which keeps the old "one ValueError per bad record"
+# behaviour. Collect-all hands it a plain list and returns every violation.
+
+class _FailFast:
+    """Error sink that raises on the first reported problem."""
+    __slots__ = ()
+
+    def append(self, message):
+        raise ValueError(message)
+
+
+_FAIL_FAST = _FailFast()
+
+
+def compile_schema(schema, collect_all=False):
+    """Compile a schema into a validator function.
+
+    With collect_all=False the validator raises ValueError on the first violation.
+    With collect_all=True it returns the list of all violations (empty when valid).
+    """
+    check_root = _compile_node(schema)
+
+    if collect_all:
+        def validate(record):
+            errors = []
+            check_root(record, "", errors)
+            return errors
+    else:
+        def validate(record):
+            check_root(record, "", _FAIL_FAST)
+
+    validate.__doc__ = "Validator compiled from a schema by compile_schema."
+    return validate
+
+
+validate_user_profile = compile_schema(USER_PROFILE_SCHEMA)
+collect_user_profile_errors = compile_schema(USER_PROFILE_SCHEMA, collect_all=True)
+
+
+if __name__ == "__main__":
+    user_profile = {
+        "username": "validUser_123",
+        "password": "Passw0rd!",
+        "email": "user@example.com",
+        "age": 30,
+        "addresses": [
+            {"street": "123 Main St", "city": "Anytown", "state": "NY", "zip_code": "12345"}
+        ],
+        "social_media": {
+            "facebook": "https://www.facebook.com/validUser_123",
+            "twitter": "https://twitter.com/validUser_123"
+        }
+    }
+
+    try:
+        validate_user_profile(user_profile)
+        print("User profile is valid. Proceeding with account creation.")
+    except ValueError as e:
+        print(f"Validation error: {e}")
+
+    broken_profile = {
+        "username": "no",
+        "password": "weak",
+        "age": "thirty",
+        "addresses": [{"street": "1 Elm St", "city": "Springfield", "state": "ny", "zip_code": "123"}],
+        "social_media": {"twitter": "https://example.com/someone"},
+    }
+
+    try:
+        validate_user_profile(broken_profile)
+    except ValueError as e:
+        print(f"Fail-fast validation error: {e}")
+
+    # One pass reports every violation
+    for error in collect_user_profile_errors(broken_profile):
+        print(f"Validation error: {error}")
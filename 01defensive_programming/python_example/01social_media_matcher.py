@@ -0,0 +1,191 @@
+
+# Social Media Matcher: is_valid_social_media in 01input_validation.py keeps one
+# regex per platform and can only check a link whose platform is already known.
+# With dozens of platforms and allow-listed domains we also want to classify an
+# unknown link, and trying every platform's regex in turn gets slower with each
+# platform added.
+#
+# The matcher scans a URL once with a single compiled regex that splits it into
+# host and path, then walks a host-suffix trie (labels in reverse order, so
+# "www.facebook.com" is looked up as com -> facebook -> www). The cost depends
+# on the number of labels in the host, not on the number of platforms.
+
+import re
+import time
+
+# Same shape as the original patterns: optional scheme, host, "/" and one
+# character from [a-zA-Z0-9(.?)]
+URL_RE = re.compile(r'^(?:https?:\/\/)?([^\/]+)\/[a-zA-Z0-9(\.\?)]')
+
+DEFAULT_PLATFORMS = {
+    "facebook": ["facebook.com", "www.facebook.com"],
+    "twitter": ["twitter.com", "www.twitter.com"],
+}
+
+
+# Example #1: Host-suffix trie
+# Each node is a dict of label -> child node. Two reserved keys mark matches:
+#   _EXACT    - the host ends exactly here
+#   _WILDCARD - any subdomain below this node matches ("*.example.com")
+
+_EXACT = 0
+_WILDCARD = 1
+
+
+def _build_trie(platforms):
+    root = {}
+    for platform, domains in platforms.items():
+        for domain in domains:
+            wildcard = domain.startswith("*.")
+            labels = (domain[2:] if wildcard else domain).split(".")
+            node = root
+            for label in reversed(labels):
+                node = node.setdefault(label, {})
+            node[_WILDCARD if wildcard else _EXACT] = platform
+    return root
+
+
+class SocialMediaMatcher:
+    """Classify and validate social media links against a set of allow-listed domains.
+
+    platforms maps a platform name to its domains. A domain written as
+    "*.example.com" also matches any subdomain of example.com.
+    """
+
+    def __init__(self, platforms=DEFAULT_PLATFORMS):
+        self._trie = _build_trie(platforms)
+        self.platforms = frozenset(platforms)
+
+    def classify_host(self, host):
+        """Return the platform a host belongs to, or None."""
+        node = self._trie
+        wildcard_match = None
+        labels = host.split(".")
+        for i in range(len(labels) - 1, -1, -1):
+            node = node.get(labels[i])
+            if node is None:
+                return wildcard_match
+            if i and _WILDCARD in node:
+                wildcard_match = node[_WILDCARD]
+        return node.get(_EXACT, wildcard_match)
+
+    def classify(self, url):
+        """Return the platform a link points to, or None if it is not a valid platform link."""
+        match = URL_RE.match(url)
+        if match is None:
+            return None
+        return self.classify_host(match.group(1))
+
+    def classify_many(self, urls):
+        """Classify a batch of links; returns one platform name (or None) per link."""
+        match_url = URL_RE.match
+        classify_host = self.classify_host
+        results = []
+        for url in urls:
+            match = match_url(url)
+            results.append(classify_host(match.group(1)) if match else None)
+        return results
+
+    def is_valid(self, platform, url):
+        """Check that a link is a valid link for the given platform."""
+        return self.classify(url) == platform
+
+    def is_valid_social_media(self, links):
+        """Drop-in replacement for is_valid_social_media: unknown platforms are ignored."""
+        for platform, url in links.items():
+            if platform in self.platforms and self.classify(url) != platform:
+                return False
+        return True
+
+
+default_matcher = SocialMediaMatcher()
+is_valid_social_media = default_matcher.is_valid_social_media
+
+
+# Example #2: Benchmark, scaling the number of platforms
+# Baselines:
+#   per-platform regexes  - the original approach, trying each platform's regex in turn
+#   combined alternation  - one regex with every domain in a single alternation group
+
+def make_platforms(count):
+    platforms = dict(DEFAULT_PLATFORMS)
+    for i in range(count - len(platforms)):
+        platforms[f"site{i}"] = [f"site{i}.com", f"www.site{i}.com", f"*.cdn.site{i}.net"]
+    return platforms
+
+
+def _per_platform_regexes(platforms):
+    patterns = {}
+    for platform, domains in platforms.items():
+        hosts = "|".join(
+            r"[^\/]+\." + re.escape(d[2:]) if d.startswith("*.") else re.escape(d) for d in domains
+        )
+        patterns[platform] = re.compile(rf'^(?:https?:\/\/)?(?:{hosts})\/[a-zA-Z0-9(\.\?)]')
+
+    def classify(url):
+        for platform, pattern in patterns.items():
+            if pattern.match(url):
+                return platform
+        return None
+
+    return classify
+
+
+def _combined_alternation(platforms):
+    groups = []
+    names = []
+    for platform, domains in platforms.items():
+        hosts = "|".join(
+            r"[^\/]+\." + re.escape(d[2:]) if d.startswith("*.") else re.escape(d) for d in domains
+        )
+        groups.append(f"({hosts})")
+        names.append(platform)
+    pattern = re.compile(rf'^(?:https?:\/\/)?(?:{"|".join(groups)})\/[a-zA-Z0-9(\.\?)]')
+
+    def classify(url):
+        match = pattern.match(url)
+        return names[match.lastindex - 1] if match else None
+
+    return classify
+
+
+def benchmark(links_per_run=20_000):
+    for count in (2, 10, 50, 200):
+        platforms = make_platforms(count)
+        names = list(platforms)
+        urls = []
+        for i in range(links_per_run):
+            name = names[i % count]
+            domain = platforms[name][i % len(platforms[name])].replace("*", "img")
+            urls.append(f"https://{domain}/user{i}" if i % 10 else f"https://unknown{i}.org/user")
+
+        matcher = SocialMediaMatcher(platforms)
+        start = time.perf_counter()
+        expected = matcher.classify_many(urls)
+        trie_time = time.perf_counter() - start
+
+        timings = []
+        for build in (_per_platform_regexes, _combined_alternation):
+            classify = build(platforms)
+            start = time.perf_counter()
+            result = [classify(url) for url in urls]
+            timings.append(time.perf_counter() - start)
+            assert result == expected, f"{build.__name__} disagrees with the trie matcher"
+
+        print(f"{count:>3} platforms: per-platform {links_per_run / timings[0]:>10,.0f}/sec, "
+              f"alternation {links_per_run / timings[1]:>10,.0f}/sec, "
+              f"trie {links_per_run / trie_time:>10,.0f}/sec")
+
+
+if __name__ == "__main__":
+    links = {
+        "facebook": "https://www.facebook.com/validUser_123",
+        "twitter": "https://twitter.com/validUser_123"
+    }
+    print(is_valid_social_media(links))
+    print(default_matcher.classify_many([
+        "https://twitter.com/someone",
+        "facebook.com/someone",
+        "https://facebook.com.evil.example/someone",
+    ]))
+    benchmark()
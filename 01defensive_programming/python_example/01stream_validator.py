@@ -0,0 +1,159 @@
+
+# Streaming Validator: a pipeline stage that reads newline-delimited JSON user
+# profiles, validates them on all cores and splits them into accepted and
+# rejected outputs.
+#
+# - Memory stays bounded: lines are read lazily and only a fixed number of
+#   chunks are in flight at any time, no matter how large the input is.
+# - Output order matches input order: chunks are written back in the order
+#   they were submitted.
+# - Bad input never stops the stream: unparsable lines, lines that are not
+#   valid UTF-8 and invalid profiles go to the rejected output together with
+#   the reasons. The input is decoded with errors="surrogateescape", so bad
+#   bytes survive the read and are reported instead of aborting it.
+#
+# Usage:
+#   python3 01stream_validator.py profiles.jsonl --accepted ok.jsonl --rejected bad.jsonl
+#   cat profiles.jsonl | python3 01stream_validator.py - --workers 8
+
+import argparse
+import contextlib
+import importlib
+import itertools
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+schema_compiler = importlib.import_module("01schema_compiler")
+
+
+# Example #1: Validating one chunk (runs inside a worker process)
+
+def validate_line(line):
+    """Validate a single JSON line and return the list of errors (empty when valid)."""
+    if not line.isascii():
+        try:
+            line.encode("utf-8")
+        except UnicodeEncodeError as e:
+            # Undecodable bytes arrive as lone surrogates (surrogateescape)
+            return [f"invalid UTF-8 at character {e.start}"]
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        return [f"invalid JSON: {e}"]
+    return schema_compiler.collect_user_profile_errors(record)
+
+
+def validate_chunk(first_line_number, lines):
+    """Validate a chunk of lines, returning (line_number, line, errors) for each."""
+    return [
+        (line_number, line, validate_line(line))
+        for line_number, line in enumerate(lines, start=first_line_number)
+    ]
+
+
+# Example #2: Reading the input lazily in chunks
+
+def read_chunks(stream, chunk_size):
+    """Yield (first_line_number, lines) chunks without reading the whole stream."""
+    line_number = 1
+    lines = (line.rstrip("\n") for line in stream)
+    while True:
+        chunk = list(itertools.islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield line_number, chunk
+        line_number += len(chunk)
+
+
+# Example #3: Order-preserving fan-out with bounded memory
+# At most max_in_flight chunks are submitted but not yet written. When the
+# window is full we wait for the oldest chunk, which is also the next one to write.
+
+def write_results(results, accepted, rejected):
+    counts = [0, 0]
+    for line_number, line, errors in results:
+        if not line.strip():
+            continue
+        if errors:
+            rejected.write(json.dumps({"line": line_number, "errors": errors, "record": line}) + "\n")
+            counts[1] += 1
+        else:
+            accepted.write(line + "\n")
+            counts[0] += 1
+    return counts
+
+
+def run_pipeline(stream, accepted, rejected, workers=None, chunk_size=1000, max_in_flight=None):
+    """Validate a JSON-lines stream and return (accepted_count, rejected_count)."""
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 2
+    total_accepted = total_rejected = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for first_line_number, lines in read_chunks(stream, chunk_size):
+            pending.append(executor.submit(validate_chunk, first_line_number, lines))
+            if len(pending) >= max_in_flight:
+                ok, bad = write_results(pending.popleft().result(), accepted, rejected)
+                total_accepted += ok
+                total_rejected += bad
+        while pending:
+            ok, bad = write_results(pending.popleft().result(), accepted, rejected)
+            total_accepted += ok
+            total_rejected += bad
+
+    return total_accepted, total_rejected
+
+
+# Example #4: Command line entry point
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Validate newline-delimited JSON user profiles.")
+    parser.add_argument("input", nargs="?", default="-", help="input file, or - for stdin (default)")
+    parser.add_argument("--accepted", default="-", help="output for valid records, or - for stdout (default)")
+    parser.add_argument("--rejected", default="rejected.jsonl", help="output for invalid records")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="lines per chunk sent to a worker")
+    return parser.parse_args(argv)
+
+
+def _open(path, mode):
+    """Open a file, or wrap stdin/stdout for "-" so leaving the with block does not close them.
+
+    Input is read with errors="surrogateescape", so invalid UTF-8 reaches
+    validate_line instead of raising UnicodeDecodeError here.
+    """
+    reading = "r" in mode
+    if path == "-":
+        if reading:
+            sys.stdin.reconfigure(encoding="utf-8", errors="surrogateescape")
+        return contextlib.nullcontext(sys.stdin if reading else sys.stdout)
+    return open(path, mode, encoding="utf-8", errors="surrogateescape" if reading else "strict")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.chunk_size <= 0:
+        print("Error: --chunk-size must be positive", file=sys.stderr)
+        return 2
+
+    with contextlib.ExitStack() as stack:
+        files = []
+        for name, path, mode in (("input", args.input, "r"), ("accepted output", args.accepted, "w"),
+                                 ("rejected output", args.rejected, "w")):
+            try:
+                files.append(stack.enter_context(_open(path, mode)))
+            except OSError as e:
+                print(f"Error: cannot open {name}: {e}", file=sys.stderr)
+                return 1
+        ok, bad = run_pipeline(*files, args.workers, args.chunk_size)
+
+    print(f"Accepted {ok} records, rejected {bad} records.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
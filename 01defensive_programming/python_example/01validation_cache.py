@@ -0,0 +1,206 @@
+
+# Validation Cache: ingest data repeats itself. The same social-media URLs,
+# addresses and email addresses show up across many profiles, and each of them
+# gets re-validated from scratch. A bounded LRU cache with a TTL in front of the
+# validators answers repeats from memory.
+#
+# Cache keys are built from normalized fields, but only with normalizations that
+# cannot change the verdict (for example, lowercasing an ASCII email). The key
+# tuple itself is stored, so a hash collision can never return another value's verdict.
+
+import importlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+validation_engine = importlib.import_module("01validation_engine")
+
+
+# Example #1: The validators being cached (same rules as Example #4 of 01input_validation.py)
+
+STATE_RE = re.compile(r'^[A-Z]{2}$')
+ZIP_CODE_RE = re.compile(r'^\d{5}$')
+SOCIAL_MEDIA_PATTERNS = {
+    "facebook": re.compile(r'^(https?:\/\/)?(www\.)?facebook\.com\/[a-zA-Z0-9(\.\?)?]'),
+    "twitter": re.compile(r'^(https?:\/\/)?(www\.)?twitter\.com\/[a-zA-Z0-9(\.\?)?]'),
+}
+
+
+def is_valid_address(address):
+    if not all(key in address for key in ["street", "city", "state", "zip_code"]):
+        return False
+    if not STATE_RE.match(address["state"]):
+        return False
+    if not ZIP_CODE_RE.match(address["zip_code"]):
+        return False
+    return True
+
+
+def is_valid_social_media(links):
+    for key, url in links.items():
+        if key in SOCIAL_MEDIA_PATTERNS and not SOCIAL_MEDIA_PATTERNS[key].match(url):
+            return False
+    return True
+
+
+# Example #2: Key functions
+# A key function returns a hashable key for a value, or None when the value
+# cannot be keyed safely (the validator is then called directly). Keys only
+# need to be cheap and exact; two spellings of the same value getting separate
+# entries costs a little hit rate, never correctness.
+
+_MISSING = object()
+
+
+def email_key(email):
+    # The email regex treats upper and lower case ASCII letters alike
+    if isinstance(email, str) and email.isascii():
+        return email.lower()
+    return None
+
+
+def address_key(address):
+    # is_valid_address only looks at state, zip_code and whether street/city exist
+    if not isinstance(address, dict):
+        return None
+    return (address.get("state", _MISSING), address.get("zip_code", _MISSING),
+            "street" in address, "city" in address)
+
+
+def social_media_key(links):
+    if not isinstance(links, dict):
+        return None
+    return tuple(links.items())
+
+
+# Example #3: Bounded LRU cache with TTL and counters
+
+class ValidationCache:
+    """Memoize a validator in a bounded LRU cache whose entries expire after ttl seconds.
+
+    Set enabled=False, or pass bypass=True to a call, to skip the cache and call the
+    validator directly, e.g. to compare results and latency.
+    """
+
+    def __init__(self, validator, key_func, maxsize=100_000, ttl=300.0, enabled=True):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.validator = validator
+        self.key_func = key_func
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, value, bypass=False):
+        if bypass or not self.enabled:
+            return self.validator(value)
+        key = self.key_func(value)
+        if key is None:
+            return self.validator(value)
+
+        try:
+            hash(key)
+        except TypeError:
+            # Unhashable field values, e.g. a list where a string was expected
+            return self.validator(value)
+
+        # The lookup, the LRU reordering and the counters share the lock, so
+        # no hit or miss is lost under threads; the validator runs outside it
+        entries = self._entries
+        now = time.monotonic()
+        with self._lock:
+            entry = entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self.hits += 1
+                    entries.move_to_end(key)
+                    return entry[0]
+                self.expirations += 1
+            self.misses += 1
+
+        verdict = self.validator(value)
+
+        with self._lock:
+            entries[key] = (verdict, now + self.ttl)
+            entries.move_to_end(key)
+            while len(entries) > self.maxsize:
+                entries.popitem(last=False)
+                self.evictions += 1
+        return verdict
+
+    def stats(self):
+        with self._lock:
+            size, hits, misses = len(self._entries), self.hits, self.misses
+            evictions, expirations = self.evictions, self.expirations
+        lookups = hits + misses
+        return {
+            "size": size,
+            "hits": hits,
+            "misses": misses,
+            "evictions": evictions,
+            "expirations": expirations,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+
+cached_is_valid_email = ValidationCache(validation_engine.is_valid_email, email_key)
+cached_is_valid_address = ValidationCache(is_valid_address, address_key)
+cached_is_valid_social_media = ValidationCache(is_valid_social_media, social_media_key)
+
+
+# Example #4: Benchmark on a repetition-heavy workload
+
+def make_profiles(n, distinct=500):
+    """Generate n profiles drawn from a small pool of distinct field values."""
+    profiles = []
+    for i in range(n):
+        j = (i * 7919) % distinct
+        profiles.append({
+            "email": f"User{j}@Example.com",
+            "address": {"street": f"{j} Main St", "city": "Anytown", "state": "NY" if j % 9 else "ny",
+                        "zip_code": f"{10000 + j}"},
+            "social_media": {"facebook": f"https://www.facebook.com/user{j}",
+                             "twitter": f"https://twitter.com/user{j}"},
+        })
+    return profiles
+
+
+def _run(cache, values, bypass):
+    start = time.perf_counter()
+    verdicts = [cache(value, bypass) for value in values]
+    return verdicts, time.perf_counter() - start
+
+
+def benchmark(n=300_000):
+    # A precompiled regex check is about as cheap as building a cache key, so the
+    # per-validator numbers show where the cache actually pays off.
+    profiles = make_profiles(n)
+    for field, cache in (("email", cached_is_valid_email),
+                         ("address", cached_is_valid_address),
+                         ("social_media", cached_is_valid_social_media)):
+        values = [p[field] for p in profiles]
+        expected, direct_time = _run(cache, values, bypass=True)
+        verdicts, cached_time = _run(cache, values, bypass=False)
+        assert verdicts == expected, f"Cached and direct {field} validators disagree"
+        print(f"{field}: direct {n / direct_time:,.0f}/sec, cached {n / cached_time:,.0f}/sec")
+        print(f"    {cache.stats()}")
+
+
+if __name__ == "__main__":
+    print(cached_is_valid_email("user@example.com"))
+    print(cached_is_valid_email("USER@example.com"))  # served from the cache
+    print(cached_is_valid_email.stats())
+    cached_is_valid_email.clear()
+    benchmark()
@@ -0,0 +1,223 @@
+
+# Async Fail-Safe API Calls: safe_api_call in 02fail_safe_defaults.py handles one
+# URL at a time, so a cycle over hundreds of endpoints takes the sum of their
+# latencies. The asyncio version below keeps many requests in flight, bounds
+# them with a semaphore and enforces both a per-request and an overall deadline.
+#
+# Failures are classified the same way as in the sync version: a timeout returns
+# the "Request timed out" fail-safe dict, and any other request error returns the
+# "Error in request" one. gather_safe never raises for a single bad URL.
+#
+# Only the standard library is used: the client speaks plain HTTP/1.1 over
+# asyncio.open_connection, and the stub server is built on asyncio.start_server.
+
+import asyncio
+import json
+import ssl
+import time
+from urllib.parse import urlsplit
+
+TIMED_OUT = {'status': 'fail', 'data': 'Request timed out'}
+REQUEST_ERROR = {"status": "fail", "data": "Error in request"}
+
+
+class RequestError(Exception):
+    """Malformed URL or HTTP response."""
+
+
+# Example #1: A minimal HTTP/1.1 GET
+
+async def _read_body(reader, headers, max_body=None):
+    # With max_body, at most that many bytes are read and the rest of the
+    # response is dropped; the connection is closed afterwards anyway
+    limit = float("inf") if max_body is None else max_body
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        total = 0
+        while total < limit:
+            size_line = await reader.readline()
+            try:
+                size = int(size_line.split(b";")[0], 16)
+            except ValueError:
+                raise RequestError("Malformed chunked response") from None
+            if size == 0:
+                await reader.readline()
+                break
+            chunks.append(await reader.readexactly(min(size, limit - total)))
+            total += len(chunks[-1])
+            if total < limit:
+                await reader.readline()
+        return b"".join(chunks)
+    if "content-length" in headers:
+        return await reader.readexactly(min(int(headers["content-length"]), limit))
+    if max_body is None:
+        return await reader.read()
+    chunks = []
+    total = 0
+    while total < max_body:
+        data = await reader.read(max_body - total)
+        if not data:
+            break
+        chunks.append(data)
+        total += len(data)
+    return b"".join(chunks)
+
+
+_ssl_context = None
+
+
+def _client_ssl_context():
+    # Creating a context loads the CA store, so it is done once
+    global _ssl_context
+    if _ssl_context is None:
+        _ssl_context = ssl.create_default_context()
+    return _ssl_context
+
+
+async def http_request(url, accept="application/json", max_body=None):
+    """GET a URL and return (status, headers, body bytes); header names are lowercase.
+
+    With max_body, the body is truncated to its first max_body bytes.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise RequestError(f"Invalid URL {url!r}")
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+
+    reader, writer = await asyncio.open_connection(
+        parts.hostname, port, ssl=_client_ssl_context() if parts.scheme == "https" else None)
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+                     f"Accept: {accept}\r\nConnection: close\r\n\r\n".encode("ascii"))
+        await writer.drain()
+
+        status_line = await reader.readline()
+        try:
+            status = int(status_line.split()[1])
+        except (IndexError, ValueError):
+            raise RequestError(f"Malformed status line {status_line!r}") from None
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return status, headers, await _read_body(reader, headers, max_body)
+    finally:
+        writer.close()
+
+
+async def http_get(url):
+    """GET a URL and return (status, body bytes)."""
+    status, _, body = await http_request(url)
+    return status, body
+
+
+# Example #2: The async fail-safe call
+
+async def safe_api_call_async(url, timeout=5, semaphore=None):
+    """Make a safe API call with a specified timeout, without blocking the event loop."""
+    try:
+        if semaphore is None:
+            status, body = await asyncio.wait_for(http_get(url), timeout)
+        else:
+            async with semaphore:
+                status, body = await asyncio.wait_for(http_get(url), timeout)
+        return json.loads(body)
+    except asyncio.TimeoutError:
+        print(f"Request timed out after {timeout} seconds. Using fail-safe response.")
+        return dict(TIMED_OUT)
+    except (OSError, RequestError, ValueError, asyncio.IncompleteReadError) as e:
+        print(f"An error occured: {e}")
+        return dict(REQUEST_ERROR)
+
+
+# Example #3: Many calls with a concurrency limit and an overall deadline
+
+async def gather_safe(urls, concurrency=100, timeout=5, deadline=None):
+    """Call every URL concurrently and return one result per URL, in order.
+
+    At most `concurrency` requests are in flight, each is limited to `timeout`
+    seconds, and anything unfinished after `deadline` seconds gets the
+    timed-out fail-safe dict.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [asyncio.ensure_future(safe_api_call_async(url, timeout, semaphore)) for url in urls]
+    if not tasks:
+        return []
+
+    done, pending = await asyncio.wait(tasks, timeout=deadline)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+        print(f"Overall deadline of {deadline} seconds reached; "
+              f"{len(pending)} requests use the fail-safe response.")
+    return [task.result() if task in done else dict(TIMED_OUT) for task in tasks]
+
+
+# Example #4: Stub server and benchmark
+
+async def _stub_handler(reader, writer):
+    try:
+        request_line = await reader.readline()
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        path = request_line.split()[1].decode() if len(request_line.split()) > 1 else "/"
+        if path.startswith("/slow"):
+            await asyncio.sleep(10)
+        body = b"not json" if path.startswith("/bad") else json.dumps({"status": "ok", "path": path}).encode()
+        await asyncio.sleep(0.01)  # simulated backend latency
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                     b"Content-Length: " + str(len(body)).encode() + b"\r\nConnection: close\r\n\r\n" + body)
+        await writer.drain()
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_stub_server():
+    """Start a local stub server; returns (server, base_url)."""
+    server = await asyncio.start_server(_stub_handler, "127.0.0.1", 0, backlog=1024)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def benchmark(count=500):
+    server, base = await start_stub_server()
+    async with server:
+        urls = [f"{base}/data/{i}" for i in range(count)]
+
+        start = time.perf_counter()
+        for url in urls[:50]:
+            await safe_api_call_async(url)
+        sequential_rate = 50 / (time.perf_counter() - start)
+
+        for concurrency in (10, 100, 500):
+            start = time.perf_counter()
+            results = await gather_safe(urls, concurrency=concurrency)
+            rate = count / (time.perf_counter() - start)
+            assert all(r["status"] == "ok" for r in results)
+            print(f"concurrency {concurrency:>3}: {rate:8,.0f} req/sec (one at a time: {sequential_rate:,.0f} req/sec)")
+
+
+async def demo():
+    server, base = await start_stub_server()
+    async with server:
+        results = await gather_safe(
+            [f"{base}/data", f"{base}/bad", f"{base}/slow", "http://127.0.0.1:1/refused"],
+            timeout=0.5,
+        )
+        for result in results:
+            print(result)
+        print(await gather_safe([f"{base}/slow"] * 3, timeout=5, deadline=0.3))
+
+
+if __name__ == "__main__":
+    asyncio.run(demo())
+    asyncio.run(benchmark())
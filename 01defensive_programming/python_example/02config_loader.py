@@ -0,0 +1,196 @@
+
+# Cached Configuration Loader: load_configuration in 02fail_safe_defaults.py
+# reopens and re-parses the JSON file and merges in the defaults on every call.
+# When it is called per request, that work is repeated for a file that almost
+# never changes.
+#
+# The loader below parses the file once and keeps an immutable, already-merged
+# snapshot. A call only re-reads the file when its (mtime, size, inode)
+# signature has changed, and an optional watcher thread polls the file in the
+# background and swaps in a new snapshot atomically.
+# The fail-safe behavior is unchanged: a missing or corrupt file gives the defaults.
+
+import json
+import os
+import threading
+import time
+from types import MappingProxyType
+
+DEFAULT_CONFIG = MappingProxyType({"timeout": 30, "retry_attempts": 3, "log_level": "INFO"})
+
+
+# Example #1: Parsing and merging, once per file version
+
+def _file_signature(file_path):
+    """Return (mtime_ns, size, inode) for a file, or None if it cannot be stat'ed."""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _parse_config(file_path, defaults):
+    """Read and merge a config file. Returns (snapshot, error message or None)."""
+    try:
+        with open(file_path, 'r') as config_file:
+            config = json.load(config_file)
+        if not isinstance(config, dict):
+            raise ValueError("Configuration must be a JSON object")
+    except FileNotFoundError:
+        return defaults, "Configuration file not found. Using default configs."
+    except (OSError, ValueError) as e:
+        return defaults, f"Configuration file could not be loaded ({e}). Using default configs."
+
+    merged = dict(defaults)
+    merged.update(config)
+    return MappingProxyType(merged), None
+
+
+# Example #2: The loader
+# A snapshot is replaced by a single attribute assignment, so readers always
+# see either the old or the new (snapshot, signature) pair, never a mix.
+
+class ConfigLoader:
+    """Cache a JSON configuration file and reload it only when the file changes.
+
+    check_interval limits how often get() stats the file (0 means on every call).
+    """
+
+    def __init__(self, file_path, defaults=DEFAULT_CONFIG, check_interval=0.0):
+        self.file_path = file_path
+        self.defaults = MappingProxyType(dict(defaults))
+        self.check_interval = check_interval
+        self._state = (None, None)  # (snapshot, signature)
+        self._next_check = 0.0
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+        self._listeners = []
+        self.reload_count = 0
+
+    def get(self):
+        """Return the current configuration as a read-only mapping."""
+        snapshot, signature = self._state
+        if snapshot is not None:
+            if self.check_interval and time.monotonic() < self._next_check:
+                return snapshot
+            if _file_signature(self.file_path) == signature:
+                self._next_check = time.monotonic() + self.check_interval
+                return snapshot
+        return self.refresh()
+
+    def refresh(self):
+        """Reload the file if its signature changed and return the current snapshot."""
+        with self._reload_lock:
+            snapshot, signature = self._state
+            new_signature = _file_signature(self.file_path)
+            if snapshot is not None and new_signature == signature:
+                return snapshot
+
+            new_snapshot, error = _parse_config(self.file_path, self.defaults)
+            # A file that changes while being read is picked up on the next check
+            if new_signature != _file_signature(self.file_path):
+                new_signature = None
+            if error:
+                print(error)
+            self._state = (new_snapshot, new_signature)
+            self._next_check = time.monotonic() + self.check_interval
+            self.reload_count += 1
+
+        if snapshot is not None and new_snapshot != snapshot:
+            for listener in self._listeners:
+                listener(new_snapshot)
+        return new_snapshot
+
+    def on_change(self, listener):
+        """Register a callback receiving the new snapshot after each reload that changed it."""
+        self._listeners.append(listener)
+
+    # Example #3: Hot reload by polling
+    # inotify is not in the standard library, so the watcher polls the file
+    # signature, which costs one stat() per interval.
+
+    def start_watching(self, interval=1.0):
+        """Start a daemon thread that reloads the file whenever it changes."""
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+
+        def watch():
+            while not self._stop.wait(interval):
+                self.refresh()
+
+        self._watcher = threading.Thread(target=watch, name="config-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        if self._watcher is not None:
+            self._stop.set()
+            self._watcher.join()
+            self._watcher = None
+
+
+# Example #4: Drop-in replacement for load_configuration
+
+_loaders = {}
+_loaders_lock = threading.Lock()
+
+
+def load_configuration(file_path):
+    """Loads configuration from a file, defaults if necessary. Parsed once per file version."""
+    loader = _loaders.get(file_path)
+    if loader is None:
+        with _loaders_lock:
+            loader = _loaders.setdefault(file_path, ConfigLoader(file_path))
+    return loader.get()
+
+
+# Example #5: Benchmark, parsing on every call vs the cached loader
+
+def benchmark(path, n=100_000):
+    with open(path, "w") as f:
+        json.dump({f"key{i}": i for i in range(200)}, f)
+
+    start = time.perf_counter()
+    for _ in range(n // 10):
+        _parse_config(path, DEFAULT_CONFIG)
+    parse_time = (time.perf_counter() - start) / (n // 10)
+
+    for check_interval in (0.0, 1.0):
+        loader = ConfigLoader(path, check_interval=check_interval)
+        start = time.perf_counter()
+        for _ in range(n):
+            loader.get()
+        cached_time = (time.perf_counter() - start) / n
+        print(f"Parse per call: {parse_time * 1e6:.1f} us, "
+              f"cached get() with check_interval={check_interval}: {cached_time * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    # Missing file: fail-safe defaults, reported once
+    print(dict(load_configuration('path/to/nonexistent/config.json')))
+    print(dict(load_configuration('path/to/nonexistent/config.json')))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.json")
+        with open(path, "w") as f:
+            json.dump({"timeout": 10}, f)
+
+        loader = ConfigLoader(path)
+        loader.on_change(lambda config: print(f"Reloaded: {dict(config)}"))
+        loader.start_watching(interval=0.05)
+        print(dict(loader.get()))
+
+        with open(path, "w") as f:
+            json.dump({"timeout": 5, "log_level": "DEBUG"}, f)
+        time.sleep(0.2)
+
+        with open(path, "w") as f:
+            f.write("{not json")
+        time.sleep(0.2)
+        loader.stop_watching()
+
+        benchmark(path)
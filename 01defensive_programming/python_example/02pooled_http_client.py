@@ -0,0 +1,177 @@
+
+# Pooled HTTP Client: safe_api_call in 02fail_safe_defaults.py and
+# fetch_data_from_api in 03error_handling.py call bare requests.get. Every call
+# builds a throwaway Session, opens a new TCP connection (plus a TLS handshake
+# for https) and closes it again.
+#
+# A shared client keeps one Session whose HTTPAdapter holds a connection pool
+# per host. Connections are kept alive and reused across calls and threads.
+# The fail-safe return values and the log messages stay as they were.
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Example #1: The shared client
+
+class PooledHttpClient:
+    """HTTP client with a keep-alive connection pool per host.
+
+    pool_connections - how many hosts get a cached pool
+    pool_maxsize     - connections kept open per host (set it to the number of threads)
+    pool_block       - wait for a free connection instead of opening an extra one
+    timeout          - default timeout in seconds, overridable per call
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False, timeout=5):
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                              pool_block=pool_block)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, url, timeout=None, **kwargs):
+        return self.session.get(url, timeout=self.timeout if timeout is None else timeout, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    """Return the process-wide client, creating it on first use."""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = PooledHttpClient()
+    return _default_client
+
+
+# Example #2: safe_api_call on the shared client (same fail-safe responses)
+
+def safe_api_call(url, timeout=5, client=None):
+    """Make a safe API call with a specified timeout"""
+    client = client or get_default_client()
+    try:
+        response = client.get(url, timeout=timeout)
+        return response.json()
+    except requests.exceptions.Timeout:
+        print(f"Request timed out after {timeout} seconds. Using fail-safe response.")
+        return {'status': 'fail', 'data': 'Request timed out'}
+    except requests.exceptions.RequestException as e:
+        print(f"An error occured: {e}")
+        return {"status": "fail", "data": "Error in request"}
+
+
+# Example #3: fetch_data_from_api on the shared client (same logging)
+
+def fetch_data_from_api(url, timeout=5, client=None):
+    client = client or get_default_client()
+    try:
+        response = client.get(url, timeout=timeout)
+        response.raise_for_status()
+    except requests.exceptions.HTTPError as e:
+        logging.error(f"HTTPError: {e} for URL {url}")
+        return None
+    except requests.exceptions.ConnectionError:
+        logging.error(f"ConnectionError: Failed to connect to {url}")
+        return None
+    except requests.exceptions.Timeout:
+        logging.error(f"Timeout: The request to {url} timed out.")
+        return None
+    except requests.exceptions.RequestException as e:
+        logging.error(f"RequestException: An error occurred while handling the request to {url}. Error: {e}")
+        return None
+    else:
+        try:
+            return response.json()
+        except ValueError:
+            logging.error(f"JSONDecodeError: Failed to decode JSON response from {url}")
+            return None
+
+
+# Example #4: Benchmark against an in-process stub server
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # headers and body are written separately
+    body = json.dumps({"status": "ok", "data": list(range(20))}).encode()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _StubServer(ThreadingHTTPServer):
+    request_queue_size = 128  # the default backlog of 5 drops connections under concurrency
+
+
+def start_stub_server():
+    """Start a local JSON server on a free port; returns (server, base_url)."""
+    server = _StubServer(("127.0.0.1", 0), _StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/data"
+
+
+def _bare_get(url):
+    return requests.get(url, timeout=5).json()
+
+
+def _run(fetch, url, requests_count, concurrency):
+    latencies = []
+
+    def timed(_):
+        start = time.perf_counter()
+        fetch(url)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(timed, range(requests_count)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return requests_count / elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+
+def benchmark(requests_count=2000, concurrency=16):
+    server, url = start_stub_server()
+    try:
+        with PooledHttpClient(pool_maxsize=concurrency) as client:
+            for name, fetch in (("bare requests.get", _bare_get),
+                                ("pooled client", lambda u: safe_api_call(u, client=client))):
+                rate, p50, p99 = _run(fetch, url, requests_count, concurrency)
+                print(f"{name:>18}: {rate:8,.0f} req/sec, p50 {p50 * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    result = safe_api_call('https://api.example.invalid/data', timeout=2)
+    print(result)
+    benchmark()
@@ -0,0 +1,199 @@
+
+# SQLite Connection Reuse: get_user_data in 02fail_safe_defaults.py opens a new
+# connection for every lookup and closes it again. Opening a connection
+# (file open, schema read, statement compile) costs far more than the query.
+#
+# The pool below keeps one connection per thread (sqlite3 connections are
+# bound to the thread that created them), puts the database in WAL mode so
+# readers don't block writers, keeps sqlite3's statement cache warm and reuses
+# one cursor per thread. get_users_bulk fetches many ids with a few chunked
+# queries, which stay fully parameterized.
+# Errors still fall back to the caller's default_data.
+
+import os
+import sqlite3
+import threading
+import time
+
+SQLITE_MAX_PARAMS = 500  # below SQLite's historic limit of 999 host parameters
+BULK_CHUNK = SQLITE_MAX_PARAMS // 2  # each requested id takes two parameters
+
+
+# Example #1: One connection per thread
+
+class SQLitePool:
+    """Hand out one long-lived connection and cursor per thread."""
+
+    def __init__(self, path, timeout=10, cached_statements=256, wal=True):
+        self.path = path
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.wal = wal
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout,
+                               cached_statements=self.cached_statements)
+        if self.wal:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def cursor(self):
+        """Return this thread's cursor, connecting on first use."""
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            cursor = self._connect().cursor()
+            self._local.cursor = cursor
+        return cursor
+
+    def discard(self):
+        """Drop this thread's connection, e.g. after an error left it unusable."""
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is not None:
+            self._local.cursor = None
+            with self._lock:
+                if cursor.connection in self._connections:
+                    self._connections.remove(cursor.connection)
+            try:
+                cursor.connection.close()
+            except sqlite3.Error:
+                pass
+
+    def close_all(self):
+        """Close every connection. Only call this once no thread uses the pool any more."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                pass  # owned by a thread that has already exited
+        self._local = threading.local()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path="example.db"):
+    pool = _pools.get(path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.setdefault(path, SQLitePool(path))
+    return pool
+
+
+# Example #2: get_user_data on the pool (same fail-safe semantics)
+
+def get_user_data(user_id, default_data={}, pool=None):
+    """Attempts to retrieve user data from the database, defaults to cached data on failure, using parameterized SQL queries for safety."""
+    pool = pool or get_pool()
+    try:
+        cursor = pool.cursor()
+        cursor.execute("SELECT * FROM users WHERE id=?", (user_id,))
+        data = cursor.fetchone()
+        if data:
+            return data
+        else:
+            print("User not found. Using default data.")
+            return default_data
+    except (sqlite3.OperationalError, sqlite3.DatabaseError) as e:
+        print(f"Database error: {e}. Using fail-safe default data.")
+        pool.discard()
+        return default_data
+
+
+# Example #3: Bulk lookups with chunked, parameterized queries
+# Only the number of placeholders is generated; the ids themselves are always
+# passed as parameters. Each requested id is sent with its position and joined
+# on users.id = ?, so SQLite converts it exactly as in get_user_data's
+# "WHERE id=?" ('0123', '1.0' and 1.0 all find row 1 or 123 in both paths),
+# and every row comes back tagged with the position of the id that found it.
+
+def get_users_bulk(ids, default_data=None, pool=None, chunk_size=BULK_CHUNK):
+    """Fetch many users at once. Returns {requested_id: row or default_data}."""
+    pool = pool or get_pool()
+    ids = list(dict.fromkeys(ids))
+    found = {}
+    try:
+        cursor = pool.cursor()
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            values = ",".join(["(?, ?)"] * len(chunk))
+            params = [value for pair in enumerate(chunk, start) for value in pair]
+            cursor.execute(f"WITH requested(position, id) AS (VALUES {values}) "
+                           f"SELECT requested.position, users.* FROM requested "
+                           f"JOIN users ON users.id = requested.id", params)
+            for row in cursor.fetchall():
+                found[row[0]] = row[1:]
+    except (sqlite3.OperationalError, sqlite3.DatabaseError) as e:
+        print(f"Database error: {e}. Using fail-safe default data.")
+        pool.discard()
+        return {user_id: default_data for user_id in ids}
+    return {user_id: found.get(position, default_data) for position, user_id in enumerate(ids)}
+
+
+# Example #4: Benchmark against a connection per lookup
+
+def _connect_per_lookup(path, user_id):
+    conn = sqlite3.connect(path, timeout=10)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM users WHERE id=?", (user_id,))
+        return cursor.fetchone()
+    finally:
+        conn.close()
+
+
+def create_sample_db(path, users=50_000):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, username TEXT, age INTEGER)")
+    conn.executemany("INSERT OR REPLACE INTO users VALUES (?, ?, ?)",
+                     ((i, f"user{i}", 18 + i % 80) for i in range(1, users + 1)))
+    conn.commit()
+    conn.close()
+
+
+def benchmark(path, lookups=20_000):
+    ids = [(i * 7919) % 50_000 + 1 for i in range(lookups)]
+
+    start = time.perf_counter()
+    for user_id in ids[:lookups // 10]:
+        _connect_per_lookup(path, user_id)
+    per_lookup_rate = (lookups // 10) / (time.perf_counter() - start)
+
+    pool = SQLitePool(path)
+    start = time.perf_counter()
+    for user_id in ids:
+        get_user_data(user_id, pool=pool)
+    pooled_rate = lookups / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    rows = get_users_bulk(ids, pool=pool)
+    bulk_rate = lookups / (time.perf_counter() - start)
+    assert all(rows[user_id] is not None for user_id in ids)
+    pool.close_all()
+
+    print(f"Connection per lookup: {per_lookup_rate:10,.0f} lookups/sec")
+    print(f"Pooled connection:     {pooled_rate:10,.0f} lookups/sec")
+    print(f"Bulk query:            {bulk_rate:10,.0f} lookups/sec")
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "users.db")
+        create_sample_db(path)
+        pool = SQLitePool(path)
+        default = {'name': 'Unknown', 'email': 'no-reply@example.com'}
+        print(get_user_data('123', default, pool=pool))
+        print(get_user_data('999999', default, pool=pool))
+        print(get_users_bulk([1, '2', 999999], default, pool=pool))
+        pool.close_all()
+        benchmark(path)
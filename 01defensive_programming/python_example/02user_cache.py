@@ -0,0 +1,182 @@
+
+# Read-Through User Cache: get_user_data in 02fail_safe_defaults.py falls back
+# to a placeholder default_data whenever the database fails. With a
+# read-through cache in front of the users table, the fail-safe path can
+# return the last known good row instead.
+#
+# - Fresh entries (younger than ttl) are served without touching the database.
+# - "User not found" is cached too (negative caching), for negative_ttl seconds.
+# - When the database raises, an expired row younger than stale_ttl is served
+#   stale. Only when there is nothing to serve do we return default_data.
+# - Counters and a DB latency histogram show how the cache behaves, for sizing.
+
+import bisect
+import importlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+sqlite_pool = importlib.import_module("02sqlite_pool")
+
+_NOT_FOUND = object()
+
+LATENCY_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+
+
+# Example #1: Latency histogram
+
+class LatencyHistogram:
+    """Count observations in fixed millisecond buckets."""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+
+    def observe(self, seconds):
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.total += 1
+        self.sum_ms += ms
+
+    def snapshot(self):
+        labels = [f"<={b}ms" for b in self.bounds] + [f">{self.bounds[-1]}ms"]
+        return {label: count for label, count in zip(labels, self.counts) if count}
+
+
+# Example #2: The read-through cache
+
+class UserCache:
+    """Bounded LRU read-through cache for rows of the users table."""
+
+    def __init__(self, pool, maxsize=10_000, ttl=60.0, negative_ttl=10.0, stale_ttl=3600.0):
+        self.pool = pool
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale_ttl = stale_ttl
+        self._entries = OrderedDict()  # key -> (row or _NOT_FOUND, stored_at)
+        self._lock = threading.Lock()
+        self.db_latency = LatencyHistogram()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.stale_served = 0
+        self.defaults_served = 0
+        self.db_errors = 0
+        self.evictions = 0
+
+    def _query(self, user_id):
+        cursor = self.pool.cursor()
+        start = time.perf_counter()
+        try:
+            cursor.execute("SELECT * FROM users WHERE id=?", (user_id,))
+            return cursor.fetchone()
+        finally:
+            self.db_latency.observe(time.perf_counter() - start)
+
+    def _store(self, key, value, now):
+        with self._lock:
+            self._entries[key] = (value, now)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get(self, user_id, default_data={}):
+        """Return the user's row, a stale row if the database is failing, or default_data."""
+        key = str(user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = now - stored_at
+            if value is _NOT_FOUND:
+                if age < self.negative_ttl:
+                    self.negative_hits += 1
+                    print("User not found. Using default data.")
+                    return default_data
+            elif age < self.ttl:
+                self.hits += 1
+                return value
+        self.misses += 1
+
+        try:
+            row = self._query(user_id)
+        except (sqlite3.OperationalError, sqlite3.DatabaseError) as e:
+            self.db_errors += 1
+            self.pool.discard()
+            if entry is not None and entry[0] is not _NOT_FOUND and now - entry[1] < self.stale_ttl:
+                self.stale_served += 1
+                print(f"Database error: {e}. Serving last known data.")
+                return entry[0]
+            self.defaults_served += 1
+            print(f"Database error: {e}. Using fail-safe default data.")
+            return default_data
+
+        if row:
+            self._store(key, row, now)
+            return row
+        self._store(key, _NOT_FOUND, now)
+        print("User not found. Using default data.")
+        return default_data
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def stats(self):
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hit_rate": (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "stale_served": self.stale_served,
+            "defaults_served": self.defaults_served,
+            "db_errors": self.db_errors,
+            "evictions": self.evictions,
+            "db_latency_ms": self.db_latency.snapshot(),
+        }
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "users.db")
+        sqlite_pool.create_sample_db(path, users=1000)
+        pool = sqlite_pool.SQLitePool(path)
+        cache = UserCache(pool, ttl=0.05)
+        default = {'name': 'Unknown', 'email': 'no-reply@example.com'}
+
+        print(cache.get('123', default))
+        print(cache.get('123', default))       # fresh hit
+        print(cache.get('999999', default))    # negative entry stored
+        print(cache.get('999999', default))    # negative hit
+
+        # Simulate an outage: the users table disappears
+        outage = sqlite3.connect(path)
+        outage.execute("ALTER TABLE users RENAME TO users_offline")
+        outage.commit()
+        time.sleep(0.1)  # let the cached row expire
+        print(cache.get('123', default))       # stale row instead of the placeholder
+        print(cache.get('456', default))       # nothing cached: default_data
+
+        outage.execute("ALTER TABLE users_offline RENAME TO users")
+        outage.commit()
+        outage.close()
+
+        # Steady state with a realistic TTL, then size the cache from the stats
+        cache.ttl = 60.0
+        for i in range(20_000):
+            cache.get((i * 37) % 1000 + 1, default)
+        print(cache.stats())
+        pool.close_all()
@@ -0,0 +1,180 @@
+
+# Chunked File Reading: read_file_content in 03error_handling.py, process_file
+# in 04assertions.py and read_file_with_timeout in 09timeoutslimits.py all call
+# file.read(), which loads the whole file into memory. On a multi-GB log that
+# is a multi-GB allocation.
+#
+# The helpers below stream a file in fixed-size chunks or line by line, or map
+# it with mmap for random access, so memory use does not depend on file size.
+# Failures are classified the same way as before: missing file, directory,
+# or insufficient permissions.
+
+import mmap
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+# Example #1: Streaming generators
+
+def iter_chunks(filename, chunk_size=DEFAULT_CHUNK_SIZE, binary=False, encoding="utf-8"):
+    """Yield the file in pieces of at most chunk_size bytes (or characters in text mode)."""
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    mode = "rb" if binary else "r"
+    with open(filename, mode, **({} if binary else {"encoding": encoding})) as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def iter_lines(filename, encoding="utf-8", max_line_length=None):
+    """Yield the file line by line.
+
+    With max_line_length, longer lines are yielded in pieces, so a file
+    without newlines cannot pull everything into memory either.
+    """
+    with open(filename, "r", encoding=encoding) as file:
+        if max_line_length is None:
+            yield from file
+            return
+        while True:
+            line = file.readline(max_line_length)
+            if not line:
+                return
+            yield line
+
+
+@contextmanager
+def mapped_file(filename):
+    """Map a file read-only for random access; pages are loaded by the OS on demand."""
+    with open(filename, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            yield b""  # mmap cannot map an empty file
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+# Example #2: Error classification
+
+def describe_file_error(error):
+    """Turn an OSError from opening a file into the message the examples print."""
+    if isinstance(error, FileNotFoundError):
+        return "The file does not exist"
+    if isinstance(error, IsADirectoryError):
+        return "The specified path is a directory, not a file."
+    if isinstance(error, PermissionError):
+        return "Insufficient permissions to read the file."
+    return f"Could not read the file: {error}"
+
+
+# Example #3: Streaming versions of the examples
+
+def read_file_content(filename, out=None):
+    """Print a file chunk by chunk (03error_handling.py)."""
+    out = out or sys.stdout
+    try:
+        for chunk in iter_chunks(filename):
+            out.write(chunk)
+        out.write("\n")
+    except OSError as e:
+        print(describe_file_error(e))
+
+
+def process_file(filepath, out=None):
+    """Print a file chunk by chunk after asserting it exists (04assertions.py)."""
+    assert os.path.exists(filepath), f"File {filepath} does not exist"
+    out = out or sys.stdout
+    for chunk in iter_chunks(filepath):
+        out.write(chunk)
+
+
+def read_file_with_timeout(filename, timeout, handle_chunk, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Feed a file to handle_chunk piece by piece, giving up after timeout seconds.
+
+    Unlike the version in 09timeoutslimits.py, the reader thread checks a stop
+    flag between chunks, so it really stops instead of reading on in the background.
+    """
+    stop = threading.Event()
+    outcome = [None]
+
+    def read_file():
+        try:
+            for chunk in iter_chunks(filename, chunk_size):
+                if stop.is_set():
+                    return
+                handle_chunk(chunk)
+            outcome[0] = "Done"
+        except OSError as e:
+            outcome[0] = describe_file_error(e)
+
+    thread = threading.Thread(target=read_file, daemon=True)
+    thread.start()
+    thread.join(timeout=timeout)
+    if thread.is_alive():
+        stop.set()
+        return "Reading file timed out"
+    return outcome[0]
+
+
+# Example #4: Peak memory, full read vs streaming
+
+def _peak_memory(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark(size_mb=64):
+    import tempfile
+
+    with tempfile.NamedTemporaryFile("w", suffix=".log", delete=False) as temp_file:
+        line = "2024-01-01 12:00:00 - app - INFO - request handled in 12ms\n"
+        for _ in range(size_mb * 1024 * 1024 // len(line)):
+            temp_file.write(line)
+        path = temp_file.name
+
+    try:
+        def full_read():
+            with open(path) as file:
+                return file.read().count("\n")
+
+        def chunked():
+            return sum(chunk.count("\n") for chunk in iter_chunks(path))
+
+        def lines():
+            return sum(1 for _ in iter_lines(path))
+
+        def mapped():
+            with mapped_file(path) as data:
+                # Slicing copies, so count in windows rather than data[:]
+                return sum(data[i:i + DEFAULT_CHUNK_SIZE].count(b"\n")
+                           for i in range(0, len(data), DEFAULT_CHUNK_SIZE))
+
+        for name, func in (("file.read()", full_read), ("iter_chunks", chunked),
+                           ("iter_lines", lines), ("mapped_file", mapped)):
+            start = time.perf_counter()
+            count = func()
+            elapsed = time.perf_counter() - start
+            peak = _peak_memory(func)
+            print(f"{name:>12}: {count:,} lines in {elapsed:.2f}s, peak Python memory {peak / 2**20:8.2f} MB")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    read_file_content("example.txt")
+    read_file_content(".")
+    print(read_file_with_timeout(__file__, 5, lambda chunk: None))
+    benchmark()
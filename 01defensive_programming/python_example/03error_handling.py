@@ -91,25 +91,15 @@ else:
 
 
 # Example 5: Hard : Custom Exceptions
-    
-class NetworkError(Exception):
-    """Base class for network-related errors"""
-    pass 
-
-class ServerUnreachableError(NetworkError):
-    """Exception raised when the server is unreachable"""
-    def __init__(self, server):
-        self.server = server
-        self.message = f"Cannot connect to server {server}. Server is unreachable."
-        super().__init__(self.message)
-
-class ConnectionTimeoutError(NetworkError):
-    """Exception raised when the connection to the server times out."""
-    def __init__(self, server, timeout):
-        self.server = server
-        self.timeout = timeout
-        self.message = f"Connection to server {server} timed out after {timeout} seconds."
-        super().__init__(self.message)
+# The hierarchy lives in 03network_errors.py, so errors raised here are the
+# same classes that retry and CircuitBreaker in 03resilience.py catch.
+
+import importlib
+
+network_errors = importlib.import_module("03network_errors")
+NetworkError = network_errors.NetworkError
+ServerUnreachableError = network_errors.ServerUnreachableError
+ConnectionTimeoutError = network_errors.ConnectionTimeoutError
 
 
 def connect_to_server(server):
@@ -0,0 +1,52 @@
+
+# Network Errors: the custom exception hierarchy used by Example 5 of
+# 03error_handling.py, in a module of its own so other modules can import it
+# (03error_handling.py runs its examples, including network calls, on import).
+# 03error_handling.py imports these classes too, so there is one hierarchy.
+#
+# The message is formatted lazily: constructing the exception only stores the
+# server (and timeout). The f-string runs when someone reads e.message or
+# str(e), e.g. to log or display it. When failures are common and most
+# exceptions are caught and dropped, that formatting is never paid for.
+
+class NetworkError(Exception):
+    """Base class for network-related errors"""
+    pass
+
+
+class ServerUnreachableError(NetworkError):
+    """Exception raised when the server is unreachable"""
+    def __init__(self, server):
+        self.server = server
+        super().__init__(server)
+
+    @property
+    def message(self):
+        return f"Cannot connect to server {self.server}. Server is unreachable."
+
+    def __str__(self):
+        return self.message
+
+
+class ConnectionTimeoutError(NetworkError):
+    """Exception raised when the connection to the server times out."""
+    def __init__(self, server, timeout):
+        self.server = server
+        self.timeout = timeout
+        super().__init__(server, timeout)
+
+    @property
+    def message(self):
+        return f"Connection to server {self.server} timed out after {self.timeout} seconds."
+
+    def __str__(self):
+        return self.message
+
+
+def connect_to_server(server):
+    if server == "server_unreachable":
+        raise ServerUnreachableError(server)
+    elif server == "connection_timeout":
+        raise ConnectionTimeoutError(server, 5)
+    else:
+        print(f"Succesfully connected to server {server}")
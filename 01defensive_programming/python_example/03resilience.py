@@ -0,0 +1,271 @@
+
+# Resilience: 03error_handling.py raises ServerUnreachableError and
+# ConnectionTimeoutError, but callers just print the error and give up.
+# This module uses the NetworkError hierarchy to decide what to do next:
+#
+# - retry: retries NetworkErrors with exponential backoff and full jitter, so
+#   many clients that failed together don't retry together.
+# - CircuitBreaker: after repeated failures a server is marked open and calls
+#   fail fast with CircuitOpenError instead of blocking a thread on a dead host.
+#   After reset_timeout one probe call is let through (half-open).
+# - hedged_call: if a call is slow, a second copy is started and the first
+#   result wins, which cuts tail latency.
+#
+# The breaker's hot path (a closed circuit) takes no lock: it reads one
+# attribute and bumps a counter. Only state transitions are locked.
+
+import importlib
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+network_errors = importlib.import_module("03network_errors")
+NetworkError = network_errors.NetworkError
+ServerUnreachableError = network_errors.ServerUnreachableError
+ConnectionTimeoutError = network_errors.ConnectionTimeoutError
+
+
+class CircuitOpenError(NetworkError):
+    """Exception raised when a call is rejected because the server's circuit is open"""
+    def __init__(self, server, retry_in):
+        self.server = server
+        self.retry_in = retry_in
+        super().__init__(server, retry_in)
+
+    @property
+    def message(self):
+        return f"Circuit for server {self.server} is open. Retry in {self.retry_in:.2f} seconds."
+
+    def __str__(self):
+        return self.message
+
+
+# Example #1: Retries with exponential backoff and full jitter
+
+def backoff_delays(attempts, base_delay=0.05, max_delay=2.0):
+    """Yield attempts - 1 sleep times: uniform in [0, min(max_delay, base_delay * 2**n)]."""
+    for n in range(attempts - 1):
+        yield random.uniform(0, min(max_delay, base_delay * 2 ** n))
+
+
+def retry(func, *args, attempts=4, base_delay=0.05, max_delay=2.0, retry_on=(NetworkError,),
+          give_up_on=(), **kwargs):
+    """Call func, retrying errors in retry_on that are not in give_up_on.
+
+    The last error is re-raised when all attempts fail.
+    """
+    delays = backoff_delays(attempts, base_delay, max_delay)
+    while True:
+        try:
+            return func(*args, **kwargs)
+        except give_up_on:
+            raise
+        except retry_on:
+            delay = next(delays, None)
+            if delay is None:
+                raise
+            time.sleep(delay)
+
+
+# Example #2: Circuit breaker
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """Fail fast for a server after failure_threshold consecutive failures."""
+
+    def __init__(self, server, failure_threshold=5, reset_timeout=5.0):
+        self.server = server
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.failures = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go through."""
+        if self.state == CLOSED:
+            return
+        with self._lock:
+            if self.state == OPEN:
+                retry_in = self.opened_at + self.reset_timeout - time.monotonic()
+                if retry_in > 0:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.server, retry_in)
+                self.state = HALF_OPEN  # this caller is the probe
+                return
+            if self.state == HALF_OPEN:
+                self.rejected += 1
+                raise CircuitOpenError(self.server, 0.0)
+
+    def on_success(self):
+        if self.failures:
+            self.failures = 0
+        if self.state != CLOSED:
+            with self._lock:
+                self.state = CLOSED
+
+    def on_failure(self):
+        # The unlocked increment can lose an update under contention, which only
+        # delays tripping by a call or two.
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            with self._lock:
+                if self.state != OPEN:
+                    self.state = OPEN
+                    self.opened_at = time.monotonic()
+
+    def call(self, func, *args, **kwargs):
+        self.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except NetworkError:
+            self.on_failure()
+            raise
+        except BaseException:
+            # Other errors say nothing about the server, but a failed probe
+            # must still leave HALF_OPEN, or every later call is rejected
+            if self.state == HALF_OPEN:
+                self.on_failure()
+            raise
+        self.on_success()
+        return result
+
+
+_breakers = {}
+
+
+def get_breaker(server, **settings):
+    """Return the shared breaker for a server (dict.setdefault is atomic)."""
+    breaker = _breakers.get(server)
+    if breaker is None:
+        breaker = _breakers.setdefault(server, CircuitBreaker(server, **settings))
+    return breaker
+
+
+def resilient_call(server, func, *args, attempts=4, base_delay=0.05, **kwargs):
+    """Call func(server, ...) through the server's breaker, retrying with backoff.
+
+    An open circuit is not retried: it fails fast straight away.
+    """
+    breaker = get_breaker(server)
+    return retry(breaker.call, func, server, *args, attempts=attempts, base_delay=base_delay,
+                 give_up_on=(CircuitOpenError,), **kwargs)
+
+
+# Example #3: Hedged requests
+
+_hedge_executor = ThreadPoolExecutor(max_workers=64, thread_name_prefix="hedge")
+
+
+def hedged_call(func, *args, hedge_after=0.05, max_hedges=1, executor=None, **kwargs):
+    """Start func; if no result after hedge_after seconds, start another copy.
+
+    Returns the first successful result. If every copy fails, the last error is raised.
+    Only use this for idempotent calls: a losing copy still runs to completion.
+    """
+    executor = executor or _hedge_executor
+    pending = {executor.submit(func, *args, **kwargs)}
+    hedges_left = max_hedges
+    last_error = None
+    while pending:
+        done, pending = wait(pending, timeout=hedge_after if hedges_left else None,
+                             return_when=FIRST_COMPLETED)
+        for future in done:
+            error = future.exception()
+            if error is None:
+                return future.result()
+            last_error = error
+        if hedges_left and (not done or not pending):
+            # Slow (nothing finished in time) or the only copy failed: start a hedge
+            pending.add(executor.submit(func, *args, **kwargs))
+            hedges_left -= 1
+    raise last_error
+
+
+# Example #4: Simulation benchmark with injected failures
+
+class SimulatedServers:
+    """Fake servers with a failure rate, a latency distribution and a set of dead hosts."""
+
+    def __init__(self, failure_rate, dead=(), latency=0.002, slow_rate=0.05, slow_latency=0.05,
+                 dead_timeout=0.05):
+        self.failure_rate = failure_rate
+        self.dead = set(dead)
+        self.latency = latency
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.dead_timeout = dead_timeout
+
+    def connect(self, server):
+        if server in self.dead:
+            time.sleep(self.dead_timeout)  # a dead host costs a full timeout
+            raise ConnectionTimeoutError(server, self.dead_timeout)
+        time.sleep(self.slow_latency if random.random() < self.slow_rate else self.latency)
+        if random.random() < self.failure_rate:
+            raise ServerUnreachableError(server)
+        return server
+
+
+def _run(strategy, calls, threads):
+    latencies = []
+    failures = [0]
+
+    def one(i):
+        start = time.perf_counter()
+        try:
+            strategy(f"server{i % 10}")
+        except NetworkError:
+            failures[0] += 1
+        else:
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(one, range(calls)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return calls / elapsed, failures[0] / calls, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+
+def benchmark(calls=2000, threads=32):
+    # Latency percentiles are over successful calls; failures are reported as a rate.
+    for failure_rate in (0.01, 0.1, 0.3):
+        servers = SimulatedServers(failure_rate, dead={"server9"})
+        _breakers.clear()
+        strategies = {
+            "no resilience": servers.connect,
+            "retry": lambda s: retry(servers.connect, s, base_delay=0.005),
+            "retry + breaker": lambda s: resilient_call(s, servers.connect, base_delay=0.005),
+            "hedged": lambda s: hedged_call(servers.connect, s, hedge_after=0.01),
+        }
+        print(f"failure rate {failure_rate:.0%}, server9 down:")
+        for name, strategy in strategies.items():
+            rate, failed, p50, p99 = _run(strategy, calls, threads)
+            print(f"  {name:>16}: {rate:7,.0f} calls/sec, {failed:6.1%} failed, "
+                  f"p50 {p50 * 1000:6.1f} ms, p99 {p99 * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    servers = SimulatedServers(failure_rate=0.5)
+    try:
+        print(retry(servers.connect, "server1", attempts=6))
+    except NetworkError as e:
+        print(f"Error: {e}")
+
+    breaker = get_breaker("server_unreachable", failure_threshold=2, reset_timeout=0.1)
+    for _ in range(4):
+        try:
+            breaker.call(network_errors.connect_to_server, "server_unreachable")
+        except CircuitOpenError as e:
+            print(f"Fail fast: {e}")
+        except NetworkError as e:
+            print(f"Error: {e}")
+
+    benchmark()
@@ -0,0 +1,251 @@
+
+# Result Values: exceptions are the right tool for rare failures, but when
+# failures are the common case (scanning bad input, probing dead servers) every
+# failure pays for an exception object, an f-string message and the unwinding.
+#
+# On hot paths, functions return a result tuple instead:
+#   (True, value)  - success
+#   (False, error) - failure; error is a small Error(code, args) object
+# The error message is only formatted when someone reads error.message, e.g. to
+# log or display it. The exception-raising functions are kept as thin wrappers,
+# so existing callers see the same exceptions and messages as before.
+
+import importlib
+import random
+import time
+
+validation_engine = importlib.import_module("01validation_engine")
+network_errors = importlib.import_module("03network_errors")
+
+
+# Example #1: Error codes and lazily formatted messages
+
+SERVER_UNREACHABLE = 1
+CONNECTION_TIMEOUT = 2
+NOT_A_DICT = 10
+MISSING_FIELD = 11
+USERNAME_NOT_STRING = 12
+USERNAME_EMPTY = 13
+AGE_NOT_INT = 14
+AGE_OUT_OF_RANGE = 15
+INVALID_EMAIL = 16
+
+MESSAGES = {
+    SERVER_UNREACHABLE: "Cannot connect to server {0}. Server is unreachable.",
+    CONNECTION_TIMEOUT: "Connection to server {0} timed out after {1} seconds.",
+    NOT_A_DICT: "Profile must be a dictionary.",
+    MISSING_FIELD: "Missing required fields: {0}",
+    USERNAME_NOT_STRING: "Username must be a string.",
+    USERNAME_EMPTY: "Username cannot be empty",
+    AGE_NOT_INT: "Age must be an integer",
+    AGE_OUT_OF_RANGE: "Age must be between {0} and {1}.",
+    INVALID_EMAIL: "Invalid email address.",
+}
+
+
+class Error:
+    """A failure reason: an error code plus the values needed to describe it."""
+    __slots__ = ("code", "args")
+
+    def __init__(self, code, *args):
+        self.code = code
+        self.args = args
+
+    @property
+    def message(self):
+        return MESSAGES[self.code].format(*self.args)
+
+    def __str__(self):
+        return self.message
+
+    def __repr__(self):
+        return f"Error({self.code}, {', '.join(map(repr, self.args))})"
+
+    def __eq__(self, other):
+        return isinstance(other, Error) and (self.code, self.args) == (other.code, other.args)
+
+    __hash__ = None
+
+
+def ok(value=None):
+    return (True, value)
+
+
+def err(code, *args):
+    return (False, Error(code, *args))
+
+
+# Errors without arguments never change, so they are created once
+_NOT_A_DICT = (False, Error(NOT_A_DICT))
+_USERNAME_NOT_STRING = (False, Error(USERNAME_NOT_STRING))
+_USERNAME_EMPTY = (False, Error(USERNAME_EMPTY))
+_AGE_NOT_INT = (False, Error(AGE_NOT_INT))
+_INVALID_EMAIL = (False, Error(INVALID_EMAIL))
+_MISSING = {key: (False, Error(MISSING_FIELD, key)) for key in ("username", "age", "email")}
+
+
+# Example #2: Result-returning connect_to_server
+
+def try_connect_to_server(server):
+    """Result version of connect_to_server."""
+    if server == "server_unreachable":
+        return err(SERVER_UNREACHABLE, server)
+    elif server == "connection_timeout":
+        return err(CONNECTION_TIMEOUT, server, 5)
+    return ok(server)
+
+
+_EXCEPTIONS = {
+    SERVER_UNREACHABLE: network_errors.ServerUnreachableError,
+    CONNECTION_TIMEOUT: network_errors.ConnectionTimeoutError,
+}
+
+
+def connect_to_server(server):
+    """Exception-raising wrapper, same behavior as before."""
+    success, value = try_connect_to_server(server)
+    if not success:
+        raise _EXCEPTIONS[value.code](*value.args)
+    print(f"Succesfully connected to server {server}")
+
+
+# Example #3: Result-returning validate_user_profile (Example #2 of 01input_validation.py)
+
+def check_user_profile(profile, min_age=18, max_age=120):
+    """Result version of validate_user_profile: returns (True, profile) or (False, Error)."""
+    if not isinstance(profile, dict):
+        return _NOT_A_DICT
+    for key in ("username", "age", "email"):
+        if key not in profile:
+            return _MISSING[key]
+
+    username = profile["username"]
+    if not isinstance(username, str):
+        return _USERNAME_NOT_STRING
+    if not username:
+        return _USERNAME_EMPTY
+
+    age = profile["age"]
+    if not isinstance(age, int):
+        return _AGE_NOT_INT
+    if not min_age <= age <= max_age:
+        return err(AGE_OUT_OF_RANGE, min_age, max_age)
+
+    email = profile["email"]
+    if not isinstance(email, str) or not validation_engine.is_valid_email(email):
+        return _INVALID_EMAIL
+    return (True, profile)
+
+
+def validate_user_profile(profile):
+    """Exception-raising wrapper: raises ValueError with the same messages as before."""
+    success, value = check_user_profile(profile)
+    if not success:
+        raise ValueError(value.message)
+    print("User profile is valid")
+
+
+# Example #4: Microbenchmark, exceptions vs results at different failure rates
+
+def _exception_style(profile):
+    # Same checks as check_user_profile, signaled with eagerly formatted exceptions
+    if not isinstance(profile, dict):
+        raise ValueError("Profile must be a dictionary.")
+    for key in ("username", "age", "email"):
+        if key not in profile:
+            raise ValueError(f"Missing required fields: {key}")
+    if not isinstance(profile["username"], str):
+        raise ValueError("Username must be a string.")
+    if not profile["username"]:
+        raise ValueError("Username cannot be empty")
+    if not isinstance(profile["age"], int):
+        raise ValueError("Age must be an integer")
+    if not 18 <= profile["age"] <= 120:
+        raise ValueError(f"Age must be between {18} and {120}.")
+    if not isinstance(profile["email"], str) or not validation_engine.is_valid_email(profile["email"]):
+        raise ValueError("Invalid email address.")
+
+
+def _connect_exception_style(server):
+    if server == "server_unreachable":
+        raise network_errors.ServerUnreachableError(server)
+    return server
+
+
+class _EagerUnreachable(network_errors.NetworkError):
+    # The pre-change ServerUnreachableError, for comparison
+    def __init__(self, server):
+        self.server = server
+        self.message = f"Cannot connect to server {server}. Server is unreachable."
+        super().__init__(self.message)
+
+
+def _connect_eager_style(server):
+    if server == "server_unreachable":
+        raise _EagerUnreachable(server)
+    return server
+
+
+def benchmark(n=300_000):
+    good = {"username": "john_doe", "age": 25, "email": "john.doe@example.com"}
+    bad = {"username": "john_doe", "age": 150, "email": "john.doe@example.com"}
+
+    for failure_rate in (0.1, 0.5, 0.9):
+        rng = random.Random(42)
+        profiles = [bad if rng.random() < failure_rate else good for _ in range(n)]
+        servers = ["server_unreachable" if p is bad else "server1" for p in profiles]
+
+        timings = {}
+
+        start = time.perf_counter()
+        failed = 0
+        for profile in profiles:
+            try:
+                _exception_style(profile)
+            except ValueError:
+                failed += 1
+        timings["validate: exceptions"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        failed_results = 0
+        for profile in profiles:
+            if not check_user_profile(profile)[0]:
+                failed_results += 1
+        timings["validate: results"] = time.perf_counter() - start
+        assert failed == failed_results
+
+        for name, connect in (("connect: eager exceptions", _connect_eager_style),
+                              ("connect: lazy exceptions", _connect_exception_style)):
+            start = time.perf_counter()
+            for server in servers:
+                try:
+                    connect(server)
+                except network_errors.NetworkError:
+                    pass
+            timings[name] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for server in servers:
+            try_connect_to_server(server)
+        timings["connect: results"] = time.perf_counter() - start
+
+        print(f"failure rate {failure_rate:.0%}:")
+        for name, elapsed in timings.items():
+            print(f"  {name:>26}: {n / elapsed:12,.0f} calls/sec")
+
+
+if __name__ == "__main__":
+    success, error = check_user_profile({"username": "john_doe", "age": 150, "email": "x@example.com"})
+    print(success, repr(error), error.message)
+
+    try:
+        validate_user_profile({"username": "", "age": 25, "email": "john.doe@example.com"})
+    except ValueError as e:
+        print(f"Validation error: {e}")
+
+    try:
+        connect_to_server("connection_timeout")
+    except network_errors.ConnectionTimeoutError as e:
+        print(f"Error: {e}")
+
+    benchmark()
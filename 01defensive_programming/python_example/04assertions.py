@@ -65,7 +65,7 @@ def calculate_median(sorted_numbers):
     mid = n//2
 
     if n % 2 == 0:
-        return (sorted_numbers[n-1] + sorted_numbers[n])/2
+        return (sorted_numbers[mid-1] + sorted_numbers[mid])/2
     else:
         return sorted_numbers[mid]
     
@@ -0,0 +1,213 @@
+
+# Parallel Command Runner: run_command in 04assertions.py starts a shell
+# (shell=True), buffers all of stdout/stderr in memory before decoding, and
+# checks the exit status with assert. run_command_with_timeout in
+# 09timeoutslimits.py runs one command at a time, and on timeout only the
+# direct child is killed; anything it started keeps running.
+#
+# The runner below executes many commands concurrently on asyncio subprocesses:
+# - commands are split with shlex and executed without a shell
+# - at most `workers` commands run at once
+# - stdout/stderr are read incrementally and can be streamed to a callback
+# - each command runs in its own session (process group), and on timeout the
+#   whole group is killed
+# - every command produces a CommandResult, whether it succeeded, failed,
+#   timed out or could not be started
+
+import asyncio
+import codecs
+import os
+import shlex
+import signal
+import subprocess
+import time
+
+READ_SIZE = 64 * 1024
+
+
+class CommandError(Exception):
+    """Exception raised when a command exits with a non-zero status"""
+    def __init__(self, result):
+        self.result = result
+        super().__init__(f"Command failed with error: {result.stderr}")
+
+
+# Example #1: Structured results
+
+class CommandResult:
+    """Outcome of one command; returncode is None if it timed out."""
+    __slots__ = ("command", "returncode", "stdout", "stderr", "timed_out", "duration")
+
+    def __init__(self, command, returncode, stdout, stderr, timed_out, duration):
+        self.command = command
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.timed_out = timed_out
+        self.duration = duration
+
+    @property
+    def ok(self):
+        return self.returncode == 0
+
+    def __repr__(self):
+        return (f"CommandResult(command={self.command!r}, returncode={self.returncode}, "
+                f"timed_out={self.timed_out}, duration={self.duration:.3f})")
+
+
+# Example #2: Running one command with streaming output and a timeout
+
+async def _pump(stream, name, on_output, chunks, max_output):
+    """Read a pipe to EOF, decoding incrementally; keep at most max_output characters."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    kept = 0
+    while True:
+        data = await stream.read(READ_SIZE)
+        text = decoder.decode(data, final=not data)
+        if text:
+            if on_output is not None:
+                on_output(name, text)
+            if kept < max_output:
+                chunks.append(text[:max_output - kept])
+                kept += len(chunks[-1])
+        if not data:
+            return
+
+
+def _kill_group(process):
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+async def run_command_async(command, timeout=None, on_output=None, max_output=10 * 1024 * 1024):
+    """Run one command and return a CommandResult.
+
+    on_output(stream_name, text) is called as output arrives, with stream_name
+    "stdout" or "stderr". Captured output is capped at max_output characters
+    per stream; the callback still sees everything.
+    """
+    start = time.perf_counter()
+    try:
+        args = shlex.split(command) if isinstance(command, str) else list(command)
+        if not args:
+            raise ValueError("Empty command")
+        process = await asyncio.create_subprocess_exec(
+            *args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            start_new_session=True)
+    except OSError as e:
+        # Same convention as a shell: 126 not executable, 127 not found
+        returncode = 127 if isinstance(e, FileNotFoundError) else 126
+        return CommandResult(command, returncode, "", str(e), False, time.perf_counter() - start)
+    except (ValueError, TypeError) as e:
+        # Unbalanced quotes, an empty command or non-string arguments; 2 is a
+        # shell's status for a usage or syntax error
+        return CommandResult(command, 2, "", f"Invalid command: {e}", False, time.perf_counter() - start)
+
+    stdout, stderr = [], []
+    pumps = asyncio.gather(
+        _pump(process.stdout, "stdout", on_output, stdout, max_output),
+        _pump(process.stderr, "stderr", on_output, stderr, max_output),
+        process.wait())
+    timed_out = False
+    try:
+        await asyncio.wait_for(pumps, timeout)
+    except asyncio.TimeoutError:
+        timed_out = True
+        _kill_group(process)
+        await process.wait()
+    except BaseException:
+        _kill_group(process)
+        raise
+    return CommandResult(command, None if timed_out else process.returncode,
+                         "".join(stdout), "".join(stderr), timed_out, time.perf_counter() - start)
+
+
+# Example #3: Many commands with a bounded number of workers
+
+async def run_commands_async(commands, workers=None, timeout=None, on_output=None):
+    """Run commands concurrently; results are returned in input order.
+
+    on_output(index, stream_name, text) receives streamed output, tagged with
+    the command's position in `commands`.
+    """
+    workers = workers or 4 * (os.cpu_count() or 1)
+    semaphore = asyncio.Semaphore(workers)
+
+    async def run(index, command):
+        callback = None
+        if on_output is not None:
+            callback = lambda name, text: on_output(index, name, text)  # noqa: E731
+        async with semaphore:
+            return await run_command_async(command, timeout, callback)
+
+    return await asyncio.gather(*(run(i, command) for i, command in enumerate(commands)))
+
+
+def run_commands(commands, workers=None, timeout=None, on_output=None):
+    """Synchronous entry point for run_commands_async."""
+    return asyncio.run(run_commands_async(commands, workers, timeout, on_output))
+
+
+# Example #4: The original examples on top of the runner
+
+def run_command(command):
+    """Run a command and print its output (04assertions.py), raising CommandError on failure."""
+    result = run_commands([command])[0]
+    if not result.ok:
+        raise CommandError(result)
+    print(f"Command output:\n{result.stdout}")
+
+
+def run_command_with_timeout(command, timeout):
+    """Return the command's stdout, or "Command timed out" (09timeoutslimits.py)."""
+    result = run_commands([command], timeout=timeout)[0]
+    if result.timed_out:
+        return "Command timed out"
+    return result.stdout
+
+
+# Example #5: Throughput, sequential subprocess.run vs the runner
+# Pure process startup ("echo") is CPU-bound and only scales with cores; commands
+# that wait on something (simulated with a short sleep) scale with workers.
+
+def benchmark(n=1_000):
+    workloads = {
+        "echo": [f"echo command {i}" for i in range(n)],
+        "sleep 0.02": ["sleep 0.02"] * n,
+    }
+    print(f"{os.cpu_count()} CPU(s)")
+    for label, commands in workloads.items():
+        print(f"{n:,} x '{label}':")
+        start = time.perf_counter()
+        for command in commands:
+            subprocess.run(shlex.split(command), capture_output=True)
+        elapsed = time.perf_counter() - start
+        print(f"{'subprocess.run, sequential':>30}: {n / elapsed:8,.0f} commands/sec")
+
+        for workers in (1, 4, 16, 64):
+            start = time.perf_counter()
+            results = run_commands(commands, workers=workers, timeout=10)
+            elapsed = time.perf_counter() - start
+            assert all(r.ok for r in results)
+            print(f"{f'run_commands, {workers} workers':>30}: {n / elapsed:8,.0f} commands/sec")
+
+
+if __name__ == "__main__":
+    run_command("ls")
+    try:
+        run_command("ls /nonexistent")
+    except CommandError as e:
+        print(e)
+
+    # The shell starts a background sleep; killing the process group stops both
+    start = time.perf_counter()
+    print(run_command_with_timeout("sh -c 'sleep 10 & sleep 10'", 0.5),
+          f"after {time.perf_counter() - start:.2f}s")
+
+    streamed = run_commands(["sh -c 'echo one; sleep 0.2; echo two >&2'", "nonexistent_command"],
+                            on_output=lambda i, name, text: print(f"[{i} {name}] {text}", end=""))
+    print(streamed)
+
+    benchmark()
@@ -0,0 +1,197 @@
+
+# Contracts: process_data in 04assertions.py spreads its pre- and postconditions
+# through the function body as assert statements. They cost time on every call
+# and disappear completely under `python -O`, with nothing in between.
+#
+# The @contract decorator states the conditions next to the signature and decides
+# at decoration time how much checking to compile in:
+#   CONTRACTS=off          - the function is returned unchanged: zero overhead
+#   CONTRACTS=on (default) - every call is checked
+#   CONTRACTS=0.01         - a sample of calls is checked (here 1 in 100)
+# Violations raise ContractViolation (an explicit raise, so -O keeps it) or,
+# with CONTRACTS_MODE=log, are logged and counted without interrupting the call.
+
+import functools
+import itertools
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ContractViolation(AssertionError):
+    """Exception raised when a pre- or postcondition does not hold"""
+    pass
+
+
+# Example #1: Reading the configuration
+
+def _parse_setting(value):
+    """Return the sampling rate for a CONTRACTS setting: 0.0 (off) to 1.0 (every call)."""
+    value = value.strip().lower()
+    if value in ("", "on", "1", "true", "yes"):
+        return 1.0
+    if value in ("off", "0", "false", "no"):
+        return 0.0
+    try:
+        rate = float(value)
+    except ValueError:
+        raise ValueError(f"Invalid CONTRACTS setting: {value!r}") from None
+    if not 0.0 <= rate <= 1.0:
+        raise ValueError(f"CONTRACTS sampling rate must be between 0 and 1, got {rate}")
+    return rate
+
+
+def default_rate():
+    return _parse_setting(os.environ.get("CONTRACTS", "on"))
+
+
+def default_mode():
+    return os.environ.get("CONTRACTS_MODE", "raise").strip().lower()
+
+
+# Example #2: Violation counters
+# Counters are keyed by "module.qualname". Each decoration gets its own key, so
+# decorating the same function twice adds "#2", "#3", ... instead of sharing.
+
+checks = {}
+violations = {}
+
+
+def _counter_key(func):
+    base = f"{func.__module__}.{func.__qualname__}"
+    key, n = base, 1
+    while key in checks:
+        n += 1
+        key = f"{base}#{n}"
+    return key
+
+
+def stats():
+    """Return {"module.qualname": (checked calls, violations)}."""
+    return {name: (checks.get(name, 0), violations.get(name, 0)) for name in checks}
+
+
+def _normalize(conditions, default_message):
+    """Accept a predicate, a (predicate, message) pair, or a list of either."""
+    if conditions is None:
+        return ()
+    if callable(conditions) or (isinstance(conditions, tuple) and len(conditions) == 2
+                                and callable(conditions[0]) and isinstance(conditions[1], str)):
+        conditions = [conditions]
+    normalized = []
+    for condition in conditions:
+        if callable(condition):
+            normalized.append((condition, f"{default_message}: {getattr(condition, '__name__', condition)}"))
+        else:
+            normalized.append(tuple(condition))
+    return tuple(normalized)
+
+
+# Example #3: The decorator
+# pre conditions are called with the function's arguments; post conditions with
+# the result followed by the arguments. Only the wrapper variant that is needed
+# is built, so an unsampled call never touches a counter or a random number.
+
+def contract(pre=None, post=None, rate=None, mode=None):
+    if rate is None:
+        rate = default_rate()
+    mode = mode or default_mode()
+    if mode not in ("raise", "log"):
+        raise ValueError(f"Invalid contract mode: {mode!r}")
+    preconditions = _normalize(pre, "Precondition failed")
+    postconditions = _normalize(post, "Postcondition failed")
+
+    def decorate(func):
+        if rate == 0.0 or not (preconditions or postconditions):
+            return func
+
+        key = _counter_key(func)
+        checks[key] = 0
+        violations[key] = 0
+        name = func.__qualname__
+
+        def violated(message):
+            violations[key] += 1
+            if mode == "raise":
+                raise ContractViolation(f"{name}: {message}")
+            logger.warning("Contract violation in %s: %s", name, message)
+
+        def checked_call(args, kwargs):
+            checks[key] += 1
+            for predicate, message in preconditions:
+                if not predicate(*args, **kwargs):
+                    violated(message)
+            result = func(*args, **kwargs)
+            for predicate, message in postconditions:
+                if not predicate(result, *args, **kwargs):
+                    violated(message)
+            return result
+
+        if rate == 1.0:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                return checked_call(args, kwargs)
+        else:
+            # Deterministic 1-in-N sampling: cheaper than a random number per call
+            every = max(1, round(1 / rate))
+            counter = itertools.count()
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if next(counter) % every:
+                    return func(*args, **kwargs)
+                return checked_call(args, kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+# Example #4: process_data from 04assertions.py, with a contract
+
+@contract(
+    pre=[(lambda data: isinstance(data, dict), "Input must be a dictionary"),
+         (lambda data: "name" in data and "age" in data, "Dictionary must contain 'name' and 'age'")],
+    post=(lambda result, data: "processed_name" in result and "processed_age" in result,
+          "Processing failed to meet requirements"),
+)
+def process_data(data):
+    return {"processed_name": data["name"].upper(), "processed_age": data["age"] + 10}
+
+
+# Example #5: Overhead benchmark
+
+def _process(data):
+    return {"processed_name": data["name"].upper(), "processed_age": data["age"] + 10}
+
+
+def benchmark(n=1_000_000):
+    pre = [(lambda data: isinstance(data, dict), "Input must be a dictionary"),
+           (lambda data: "name" in data and "age" in data, "Dictionary must contain 'name' and 'age'")]
+    post = (lambda result, data: "processed_name" in result, "Processing failed")
+    variants = {
+        "undecorated": _process,
+        "contract disabled": contract(pre, post, rate=0.0)(_process),
+        "contract sampled 1%": contract(pre, post, rate=0.01)(_process),
+        "contract every call": contract(pre, post, rate=1.0)(_process),
+    }
+    assert variants["contract disabled"] is _process
+    data = {"name": "John", "age": 25}
+    for name, func in variants.items():
+        start = time.perf_counter()
+        for _ in range(n):
+            func(data)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>20}: {elapsed / n * 1e9:7.1f} ns/call")
+
+
+if __name__ == "__main__":
+    print(process_data({"name": "John", "age": 25}))
+    try:
+        process_data({"name": "John"})
+    except ContractViolation as e:
+        print(f"Contract violation: {e}")
+    print(stats())
+    benchmark()
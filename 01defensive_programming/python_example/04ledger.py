@@ -0,0 +1,231 @@
+
+# Ledger: BankAccount in 04assertions.py keeps a float balance, updates it with
+# unsynchronized += / -=, and checks its invariants with assert. That means lost
+# updates under threads, rounding errors in money, and no checks at all under
+# `python -O`, which strips assert statements.
+#
+# The ledger below holds many accounts in one compact array of integer cents.
+# Updates are guarded by striped locks (account i uses lock i % stripes), so
+# threads working on different accounts rarely contend. A batch of
+# deposits/withdrawals is applied atomically: either every entry is applied or
+# none is. Invariants are checked with explicit exceptions, which -O keeps.
+
+import random
+import threading
+import time
+from array import array
+from decimal import Decimal, InvalidOperation
+
+MAX_CENTS = 2**63 - 1  # the largest value array("q") can hold
+
+
+class LedgerError(Exception):
+    """Base class for ledger errors"""
+    pass
+
+
+class InvalidAmountError(LedgerError, ValueError):
+    """Exception raised for zero, negative or malformed amounts"""
+    pass
+
+
+class InsufficientFundsError(LedgerError):
+    """Exception raised when a withdrawal would make a balance negative"""
+    def __init__(self, account, balance, amount):
+        self.account = account
+        self.balance = balance
+        self.amount = amount
+        super().__init__(f"Insufficient funds in account {account}: balance {balance} cents, "
+                         f"withdrawal {amount} cents")
+
+
+class UnknownAccountError(LedgerError, IndexError):
+    """Exception raised for an account number outside the ledger"""
+    pass
+
+
+class BalanceOverflowError(LedgerError, OverflowError):
+    """Exception raised when a balance would not fit in a signed 64-bit integer"""
+    pass
+
+
+# Example #1: Money as integer cents
+
+def to_cents(amount):
+    """Convert an amount in dollars (int, str or Decimal) to integer cents.
+
+    Floats are rejected: 0.1 + 0.2 != 0.3 is exactly the problem this avoids.
+    """
+    if isinstance(amount, bool) or isinstance(amount, float):
+        raise InvalidAmountError("Use an int, str or Decimal amount, not a float")
+    try:
+        cents = Decimal(amount) * 100
+    except (InvalidOperation, TypeError):
+        raise InvalidAmountError(f"Invalid amount: {amount!r}") from None
+    if cents != cents.to_integral_value():
+        raise InvalidAmountError(f"Amount has more than 2 decimal places: {amount!r}")
+    return int(cents)
+
+
+# Example #2: The ledger
+
+class Ledger:
+    """Balances for num_accounts accounts, stored as signed 64-bit integer cents."""
+
+    def __init__(self, num_accounts, stripes=64):
+        if num_accounts <= 0 or stripes <= 0:
+            raise ValueError("num_accounts and stripes must be positive")
+        self.balances = array("q", bytes(8 * num_accounts))
+        self.stripes = stripes
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._totals_lock = threading.Lock()
+        self.total_deposited = 0
+        self.total_withdrawn = 0
+
+    def __len__(self):
+        return len(self.balances)
+
+    def _check_account(self, account):
+        if not 0 <= account < len(self.balances):
+            raise UnknownAccountError(f"Unknown account {account}")
+
+    def balance(self, account):
+        self._check_account(account)
+        return self.balances[account]
+
+    @staticmethod
+    def _check_cents(cents, what):
+        # Same rule as apply_batch, checked before negating: -True is a plain -1
+        if not isinstance(cents, int) or isinstance(cents, bool):
+            raise InvalidAmountError(f"{what} amount must be an int number of cents, not {cents!r}")
+        if cents <= 0:
+            raise InvalidAmountError(f"{what} amount must be positive")
+
+    def deposit(self, account, cents):
+        self._check_cents(cents, "Deposit")
+        self.apply_batch([(account, cents)])
+
+    def withdraw(self, account, cents):
+        self._check_cents(cents, "Withdrawal")
+        self.apply_batch([(account, -cents)])
+
+    def transfer(self, source, target, cents):
+        self._check_cents(cents, "Transfer")
+        self.apply_batch([(source, -cents), (target, cents)])
+
+    def apply_batch(self, entries):
+        """Apply (account, delta_cents) entries atomically.
+
+        Positive deltas are deposits, negative ones withdrawals. The batch is
+        validated in full before anything is written; if any entry is invalid,
+        would overdraw an account or would overflow a balance, nothing changes.
+        """
+        deltas = {}
+        deposited = withdrawn = 0
+        for account, cents in entries:
+            if not isinstance(cents, int) or isinstance(cents, bool) or cents == 0:
+                raise InvalidAmountError(f"Invalid amount for account {account}: {cents!r}")
+            if not -MAX_CENTS <= cents <= MAX_CENTS:
+                raise InvalidAmountError(f"Amount for account {account} is out of range: {cents}")
+            self._check_account(account)
+            deltas[account] = deltas.get(account, 0) + cents
+            if cents > 0:
+                deposited += cents
+            else:
+                withdrawn -= cents
+
+        # Locks are always taken in stripe order, so two batches cannot deadlock
+        stripes = sorted({account % self.stripes for account in deltas})
+        locks = [self._locks[stripe] for stripe in stripes]
+        for lock in locks:
+            lock.acquire()
+        try:
+            balances = self.balances
+            for account, delta in deltas.items():
+                if balances[account] + delta < 0:
+                    raise InsufficientFundsError(account, balances[account], -delta)
+                if balances[account] + delta > MAX_CENTS:
+                    raise BalanceOverflowError(f"Balance of account {account} would exceed {MAX_CENTS} cents")
+            for account, delta in deltas.items():
+                balances[account] += delta
+            # Still under the stripe locks, so check_invariants never sees
+            # balances and totals out of step
+            with self._totals_lock:
+                self.total_deposited += deposited
+                self.total_withdrawn += withdrawn
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    # Example #3: Invariants that survive python -O
+
+    def check_invariants(self):
+        """Raise LedgerError if a balance is negative or money appeared or vanished."""
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            with self._totals_lock:
+                total = sum(self.balances)
+                expected = self.total_deposited - self.total_withdrawn
+            negative = next((i for i, b in enumerate(self.balances) if b < 0), None)
+        finally:
+            for lock in reversed(self._locks):
+                lock.release()
+        if negative is not None:
+            raise LedgerError(f"Account {negative} has a negative balance")
+        if total != expected:
+            raise LedgerError(f"Ledger total {total} does not match deposits - withdrawals {expected}")
+
+
+# Example #4: Throughput across thread counts
+
+def _worker(ledger, batches, batch_size, seed):
+    rng = random.Random(seed)
+    n = len(ledger)
+    for _ in range(batches):
+        batch = [(rng.randrange(n), rng.randrange(1, 1000)) for _ in range(batch_size)]
+        ledger.apply_batch(batch)
+        try:
+            ledger.transfer(rng.randrange(n), rng.randrange(n), rng.randrange(1, 500))
+        except InsufficientFundsError:
+            pass
+
+
+def benchmark(accounts=100_000, batches_per_thread=2_000, batch_size=16):
+    for stripes in (1, 64):
+        for threads in (1, 2, 4, 8):
+            ledger = Ledger(accounts, stripes=stripes)
+            workers = [threading.Thread(target=_worker, args=(ledger, batches_per_thread, batch_size, i))
+                       for i in range(threads)]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - start
+            ledger.check_invariants()
+            transactions = threads * batches_per_thread * (batch_size + 2)
+            print(f"{stripes:>2} lock stripe(s), {threads} thread(s): "
+                  f"{transactions / elapsed:10,.0f} entries/sec")
+
+
+if __name__ == "__main__":
+    ledger = Ledger(3)
+    ledger.deposit(0, to_cents("100.00"))
+    ledger.apply_batch([(0, to_cents("50")), (1, to_cents("20.25"))])
+    ledger.transfer(0, 2, to_cents("30"))
+    print([ledger.balance(i) for i in range(3)])
+
+    try:
+        ledger.apply_batch([(1, to_cents("5")), (2, -to_cents("200"))])
+    except InsufficientFundsError as e:
+        print(f"Rejected batch: {e}")
+    print([ledger.balance(i) for i in range(3)])  # unchanged: the batch was all-or-nothing
+
+    try:
+        ledger.deposit(0, to_cents(0.1))
+    except InvalidAmountError as e:
+        print(f"Rejected amount: {e}")
+
+    ledger.check_invariants()
+    benchmark()
@@ -0,0 +1,251 @@
+
+# Streaming Median and Quantiles: calculate_median in 04assertions.py needs the
+# whole list, already sorted, and re-checks the sort order in O(n) on every
+# call. A metrics stream is unbounded and unsorted, so we need estimators that
+# take one value at a time:
+#
+# - RunningMedian: the exact median, using two heaps. Memory grows with the stream.
+# - QuantileSketch: approximate quantiles in bounded memory (a merging t-digest).
+#   Values are buffered, sorted in bulk and merged into at most ~compression
+#   weighted centroids. Centroids near the tails are kept small, so extreme
+#   quantiles (p99, p99.9) stay accurate.
+#
+# Both accept unsorted input and support add, merge and query.
+
+import heapq
+import math
+import random
+import time
+from bisect import bisect_left
+
+
+# Example #1: Exact running median with two heaps
+# `low` is a max-heap (values are negated) holding the smaller half, `high` is
+# a min-heap holding the larger half. len(low) is len(high) or len(high) + 1.
+
+class RunningMedian:
+    def __init__(self, values=()):
+        self._low = []
+        self._high = []
+        for value in values:
+            self.add(value)
+
+    def __len__(self):
+        return len(self._low) + len(self._high)
+
+    def add(self, value):
+        if self._low and value > -self._low[0]:
+            heapq.heappush(self._high, value)
+            if len(self._high) > len(self._low):
+                heapq.heappush(self._low, -heapq.heappop(self._high))
+        else:
+            heapq.heappush(self._low, -value)
+            if len(self._low) > len(self._high) + 1:
+                heapq.heappush(self._high, -heapq.heappop(self._low))
+
+    def merge(self, other):
+        for value in other._high:
+            self.add(value)
+        for value in other._low:
+            self.add(-value)
+        return self
+
+    def query(self):
+        """Return the median of everything added so far."""
+        if not self._low:
+            raise ValueError("No values added")
+        if len(self._low) > len(self._high):
+            return -self._low[0]
+        return (-self._low[0] + self._high[0]) / 2
+
+    median = query
+
+
+# Example #2: Bounded-memory quantile sketch (merging t-digest)
+
+class QuantileSketch:
+    """Approximate quantiles of a stream using O(compression) memory."""
+
+    def __init__(self, compression=500, buffer_size=50_000):
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self._means = []
+        self._weights = []
+        self._buffer = []
+        self._total = 0
+        self._min = math.inf
+        self._max = -math.inf
+
+    def __len__(self):
+        return self._total + len(self._buffer)
+
+    def add(self, value):
+        self._buffer.append(value)
+        if len(self._buffer) >= self.buffer_size:
+            self._flush()
+
+    def add_many(self, values):
+        """Add a list of values; buffered in bulk instead of one append per value."""
+        buffer = self._buffer
+        for start in range(0, len(values), self.buffer_size):
+            buffer.extend(values[start:start + self.buffer_size])
+            if len(buffer) >= self.buffer_size:
+                self._flush()
+                buffer = self._buffer
+
+    def merge(self, other):
+        """Merge another sketch into this one."""
+        self._flush()
+        other._flush()
+        if not other._total:
+            return self
+        pairs = sorted(zip(self._means + other._means, self._weights + other._weights))
+        self._min = min(self._min, other._min)
+        self._max = max(self._max, other._max)
+        self._compress([], [m for m, _ in pairs], [w for _, w in pairs], self._total + other._total)
+        return self
+
+    # The k1 scale function maps a quantile to a "centroid index"; a centroid
+    # may only span one unit of k, which keeps centroids small near q=0 and q=1.
+
+    def _k(self, q):
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _weight_limit(self, weight_before, total):
+        k = self._k(weight_before / total) + 1
+        if k >= self.compression / 4:
+            return total
+        return total * (math.sin(2 * math.pi * k / self.compression) + 1) / 2
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        points = sorted(self._buffer)
+        self._buffer = []
+        self._min = min(self._min, points[0])
+        self._max = max(self._max, points[-1])
+        self._compress(points, self._means, self._weights, self._total + len(points))
+
+    def _compress(self, points, means, weights, total):
+        """Merge sorted unit-weight points and sorted centroids into new centroids."""
+        out_means = []
+        out_weights = []
+        weight_before = 0
+        current_sum = 0.0
+        current_weight = 0
+        limit = self._weight_limit(0, total)
+        i = j = 0
+        n_points, n_centroids = len(points), len(means)
+
+        while i < n_points or j < n_centroids:
+            if j < n_centroids and (i >= n_points or means[j] <= points[i]):
+                mean, weight = means[j], weights[j]
+                j += 1
+                if current_weight and weight_before + current_weight + weight > limit:
+                    out_means.append(current_sum / current_weight)
+                    out_weights.append(current_weight)
+                    weight_before += current_weight
+                    current_sum, current_weight = 0.0, 0
+                    limit = self._weight_limit(weight_before, total)
+                current_sum += mean * weight
+                current_weight += weight
+                continue
+
+            # A run of points before the next centroid is absorbed slice by slice
+            end = n_points if j >= n_centroids else bisect_left(points, means[j], i)
+            while i < end:
+                room = int(limit - weight_before - current_weight)
+                if room <= 0:
+                    if current_weight:
+                        out_means.append(current_sum / current_weight)
+                        out_weights.append(current_weight)
+                        weight_before += current_weight
+                        current_sum, current_weight = 0.0, 0
+                        limit = self._weight_limit(weight_before, total)
+                        continue
+                    room = 1
+                take = min(room, end - i)
+                current_sum += math.fsum(points[i:i + take])
+                current_weight += take
+                i += take
+
+        if current_weight:
+            out_means.append(current_sum / current_weight)
+            out_weights.append(current_weight)
+        self._means, self._weights, self._total = out_means, out_weights, total
+
+    def query(self, q):
+        """Return the estimated q-quantile (0 <= q <= 1)."""
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+        self._flush()
+        if not self._total:
+            raise ValueError("No values added")
+        if q == 0:
+            return self._min
+        if q == 1:
+            return self._max
+
+        target = q * self._total
+        means, weights = self._means, self._weights
+        # Each centroid's mean sits at the middle of its weight
+        previous_center, previous_mean = 0.0, self._min
+        cumulative = 0
+        for mean, weight in zip(means, weights):
+            center = cumulative + weight / 2
+            if target < center:
+                fraction = (target - previous_center) / (center - previous_center)
+                return previous_mean + fraction * (mean - previous_mean)
+            previous_center, previous_mean = center, mean
+            cumulative += weight
+        fraction = (target - previous_center) / (self._total - previous_center)
+        return previous_mean + fraction * (self._max - previous_mean)
+
+    def median(self):
+        return self.query(0.5)
+
+
+# Example #3: Benchmark against sort-then-index
+
+def benchmark(n=10_000_000, heap_n=1_000_000):
+    rng = random.Random(7)
+    data = [rng.lognormvariate(0, 1) for _ in range(n)]
+    quantiles = (0.5, 0.9, 0.99, 0.999)
+
+    start = time.perf_counter()
+    ordered = sorted(data)
+    exact = {q: ordered[min(n - 1, int(q * n))] for q in quantiles}
+    sort_time = time.perf_counter() - start
+    del ordered
+
+    start = time.perf_counter()
+    sketch = QuantileSketch()
+    sketch.add_many(data)
+    estimates = {q: sketch.query(q) for q in quantiles}
+    sketch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    running = RunningMedian()
+    for value in data[:heap_n]:
+        running.add(value)
+    running.query()
+    heap_time = time.perf_counter() - start
+
+    print(f"sort-then-index: {n:,} points in {sort_time:.2f}s")
+    print(f"QuantileSketch:  {n:,} points in {sketch_time:.2f}s, {len(sketch._means)} centroids")
+    print(f"RunningMedian:   {heap_n:,} points in {heap_time:.2f}s (exact, one value at a time)")
+    for q in quantiles:
+        error = abs(estimates[q] - exact[q]) / exact[q]
+        print(f"  p{q * 100:g}: exact {exact[q]:.4f}, sketch {estimates[q]:.4f} ({error:.3%} off)")
+
+
+if __name__ == "__main__":
+    running = RunningMedian([5, 3, 1, 2, 4, 6])
+    print(running.query())
+
+    left, right = QuantileSketch(), QuantileSketch()
+    for i in range(1, 1001):
+        (left if i % 2 else right).add(i)
+    print(left.merge(right).median(), left.query(0.99))
+
+    benchmark()
@@ -0,0 +1,336 @@
+
+# Payload Codecs: cache_and_process_data in 05principleleastprivelege.py always
+# round-trips its payload through json.dump/json.load. For large background-job
+# payloads (lists of many user records) JSON encoding and decoding dominate the
+# run time, and every number is parsed back from text.
+#
+# The codec layer below is selected per call:
+#   "json"    - any JSON-compatible data, as before
+#   "records" - a list of records with a fixed schema, packed column by column
+#               with struct/array. Numeric columns are read back as memoryviews
+#               straight over the buffer (zero-copy); strings are decoded only
+#               when a column or row is accessed.
+# Either codec can be wrapped in a zlib-compressed frame (compress=True). Every
+# frame starts with a small header naming the codec, so decode() needs no hints.
+# Nothing here uses pickle or marshal, so decoding untrusted frames cannot run code,
+# and a corrupt or hostile frame raises CodecError rather than anything else.
+# Decompression is capped at max_size bytes, so a small zlib bomb cannot
+# exhaust memory.
+
+import importlib
+import json
+import operator
+import struct
+import sys
+import time
+import zlib
+from array import array
+from itertools import accumulate, repeat
+
+scratch_buffer = importlib.import_module("05scratch_buffer")
+
+FRAME = struct.Struct("<4sBBxxI")  # magic, codec id, flags, payload length
+MAGIC = b"CPD1"
+COMPRESSED = 1
+MAX_SIZE = 256 * 2**20  # default limit on a decompressed payload
+
+
+class CodecError(ValueError):
+    """Exception raised for payloads a codec cannot encode or decode"""
+    pass
+
+
+# Example #1: JSON
+
+class JsonCodec:
+    id = 1
+    name = "json"
+
+    def encode(self, data):
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, buffer, lazy=False):
+        try:
+            return json.loads(bytes(buffer))
+        except (ValueError, RecursionError) as e:  # JSONDecodeError, UnicodeDecodeError
+            raise CodecError(f"Invalid JSON payload: {e}") from None
+
+
+# Example #2: Struct-packed records
+# Layout: a header (record count, single-record flag, byte order), then one
+# block per schema field, each starting on an 8-byte boundary:
+#   i64 / f64 - count packed values
+#   str       - count + 1 byte offsets (i64), then the UTF-8 bytes with each
+#               value NUL-terminated, so a whole column decodes with one
+#               decode() and split() instead of one slice per row
+
+_RECORD_HEADER = struct.Struct("<IBB2x")
+_TYPECODES = {"i64": "q", "f64": "d"}
+_LITTLE = sys.byteorder == "little"
+
+
+def _pad(size):
+    return -size % 8
+
+
+class RecordBatch:
+    """Decoded records backed by the encoded buffer."""
+
+    def __init__(self, buffer, schema):
+        view = memoryview(buffer).cast("B")
+        try:
+            count, self.single, little = _RECORD_HEADER.unpack_from(view)
+        except struct.error:
+            raise CodecError("Truncated record batch") from None
+        self._swap = bool(little) != _LITTLE
+        self._count = count
+        self._columns = {}
+        self._cache = {}
+        self._checked = set()
+        offset = _RECORD_HEADER.size
+        for name, kind in schema:
+            if kind == "str":
+                offsets = self._numbers(self._block(view, offset, 8 * (count + 1)), "q")
+                offset += 8 * (count + 1)
+                self._columns[name] = (kind, offsets, self._block(view, offset, offsets[count]))
+                offset += offsets[count]
+            else:
+                values = self._numbers(self._block(view, offset, 8 * count), _TYPECODES[kind])
+                self._columns[name] = (kind, values, None)
+                offset += 8 * count
+            offset += _pad(offset)
+
+    @staticmethod
+    def _block(view, offset, size):
+        if size < 0 or offset + size > len(view):
+            raise CodecError("Truncated or corrupt record batch")
+        return view[offset:offset + size]
+
+    def _numbers(self, block, typecode):
+        if not self._swap:
+            return block.cast(typecode)  # zero-copy
+        values = array(typecode, block)
+        values.byteswap()
+        return memoryview(values)
+
+    def __len__(self):
+        return self._count
+
+    def _check_offsets(self, name, offsets, blob):
+        # Once per column: offsets start at 0 and strictly increase (every
+        # value has at least its NUL), so each slice lies inside the blob
+        if name in self._checked:
+            return
+        bounds = offsets.tolist()
+        if bounds[0] != 0 or not all(map(operator.lt, bounds, bounds[1:])):
+            raise CodecError(f"Corrupt string offsets in column {name!r}")
+        self._checked.add(name)
+
+    def column(self, name):
+        """A memoryview for numeric fields, a list of str for string fields."""
+        kind, values, blob = self._columns[name]
+        if kind != "str":
+            return values
+        if name not in self._cache:
+            try:
+                strings = bytes(blob).decode("utf-8").split("\0")
+            except UnicodeDecodeError as e:
+                raise CodecError(f"Invalid UTF-8 in column {name!r}: {e}") from None
+            if len(strings) != self._count + 1 or strings[-1]:
+                raise CodecError(f"Corrupt string column {name!r}")
+            self._cache[name] = strings[:-1]
+        return self._cache[name]
+
+    def __getitem__(self, index):
+        record = {}
+        for name, (kind, values, blob) in self._columns.items():
+            if kind == "str":
+                self._check_offsets(name, values, blob)
+                start, end = values[index], values[index + 1] - 1
+                if blob[end] != 0:
+                    raise CodecError(f"Corrupt string column {name!r}")
+                try:
+                    record[name] = bytes(blob[start:end]).decode("utf-8")
+                except UnicodeDecodeError as e:
+                    raise CodecError(f"Invalid UTF-8 in column {name!r}: {e}") from None
+            else:
+                record[name] = values[index]
+        return record
+
+    def to_list(self):
+        names = list(self._columns)
+        if not names:
+            return [{} for _ in range(self._count)]
+        columns = [self.column(name) for name in names]
+        columns = [c.tolist() if isinstance(c, memoryview) else c for c in columns]
+        return list(map(dict, map(zip, repeat(names), zip(*columns))))
+
+
+class RecordCodec:
+    id = 2
+    name = "records"
+
+    def __init__(self, schema):
+        for field, kind in schema:
+            if kind != "str" and kind not in _TYPECODES:
+                raise ValueError(f"Unsupported field type {kind!r} for {field!r}")
+        self.schema = tuple(schema)
+
+    def encode(self, data):
+        single = isinstance(data, dict)
+        records = [data] if single else data
+        count = len(records)
+        parts = [_RECORD_HEADER.pack(count, single, _LITTLE)]
+        for name, kind in self.schema:
+            try:
+                values = [record[name] for record in records]
+            except (KeyError, TypeError):
+                raise CodecError(f"Every record must be a dict with a {name!r} field") from None
+            try:
+                if kind == "str":
+                    joined = "\0".join(values) + "\0" if values else ""
+                    if joined.count("\0") != count:
+                        raise CodecError(f"String field {name!r} cannot contain NUL characters")
+                    blob = joined.encode("utf-8")
+                    if len(blob) == len(joined):  # ASCII: characters are bytes
+                        lengths = [len(value) + 1 for value in values]
+                    else:
+                        lengths = [len(value.encode("utf-8")) + 1 for value in values]
+                    block = [array("q", accumulate(lengths, initial=0)).tobytes(), blob]
+                else:
+                    block = [array(_TYPECODES[kind], values).tobytes()]
+            except (AttributeError, TypeError, OverflowError) as e:
+                raise CodecError(f"Invalid value for {kind} field {name!r}: {e}") from None
+            parts.extend(block)
+            parts.append(bytes(_pad(sum(map(len, block)))))
+        return b"".join(parts)
+
+    def decode(self, buffer, lazy=False):
+        batch = RecordBatch(buffer, self.schema)
+        if batch.single and len(batch) != 1:
+            raise CodecError("Single-record batch does not hold exactly one record")
+        if lazy:
+            return batch
+        if batch.single:
+            return batch[0]
+        return batch.to_list()
+
+
+USER_SCHEMA = (("id", "i64"), ("name", "str"), ("email", "str"))
+
+CODECS = {codec.name: codec for codec in (JsonCodec(), RecordCodec(USER_SCHEMA))}
+_BY_ID = {codec.id: codec for codec in CODECS.values()}
+
+
+# Example #3: Framing
+
+def encode(data, codec="json", compress=False, level=1):
+    codec = CODECS[codec] if isinstance(codec, str) else codec
+    payload = codec.encode(data)
+    flags = 0
+    if compress:
+        payload = zlib.compress(payload, level)
+        flags |= COMPRESSED
+    return FRAME.pack(MAGIC, codec.id, flags, len(payload)) + payload
+
+
+def decode(buffer, lazy=False, codec=None, max_size=MAX_SIZE):
+    """Decode a frame. With lazy=True, record frames return a RecordBatch.
+
+    A lazy RecordBatch of an uncompressed frame views `buffer` directly, so the
+    buffer must stay alive and unchanged while the batch is in use. Pass codec
+    to decode records with a schema other than USER_SCHEMA. A compressed
+    payload larger than max_size bytes once decompressed raises CodecError.
+    """
+    view = memoryview(buffer).cast("B")
+    if len(view) < FRAME.size:
+        raise CodecError("Truncated frame header")
+    magic, codec_id, flags, length = FRAME.unpack_from(view)
+    if magic != MAGIC:
+        raise CodecError("Not a payload frame")
+    if codec is None:
+        if codec_id not in _BY_ID:
+            raise CodecError(f"Unknown codec id {codec_id}")
+        codec = _BY_ID[codec_id]
+    elif codec.id != codec_id:
+        raise CodecError(f"Frame was written by codec {codec_id}, not {codec.name!r}")
+    payload = view[FRAME.size:FRAME.size + length]
+    if len(payload) != length:
+        raise CodecError("Truncated frame payload")
+    if flags & COMPRESSED:
+        decompressor = zlib.decompressobj()
+        try:
+            payload = decompressor.decompress(payload, max_size)
+        except zlib.error as e:
+            raise CodecError(f"Corrupt compressed payload: {e}") from None
+        if decompressor.unconsumed_tail:
+            raise CodecError(f"Decompressed payload exceeds {max_size} bytes")
+        if not decompressor.eof:
+            raise CodecError("Truncated compressed payload")
+    return codec.decode(payload, lazy=lazy)
+
+
+# Example #4: cache_and_process_data with a codec chosen per call
+
+def cache_and_process_data(data, codec="json", compress=False):
+    """Cache data temporarily and process it in a background job."""
+    with scratch_buffer.scratch_file() as temp_file:
+        temp_file.write(encode(data, codec, compress))
+        temp_file.seek(0)
+
+        # Simulate a background job reading and processing the data
+        if temp_file.spilled:
+            processed_data = decode(temp_file.read())
+        else:
+            with temp_file.getbuffer() as view:
+                processed_data = decode(view)
+        print(f"Background job processed data: {processed_data}")
+
+
+# Example #5: Throughput and size per codec
+
+def make_users(n):
+    return [{"id": i, "name": f"user{i}", "email": f"user{i}@example.com"} for i in range(n)]
+
+
+def benchmark(n=200_000, repeat=3):
+    users = make_users(n)
+    expected_ids = sum(range(n))
+    for codec in ("json", "records"):
+        for compress in (False, True):
+            label = codec + (" + zlib" if compress else "")
+            encode_time = decode_time = lazy_time = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                frame = encode(users, codec, compress)
+                encode_time = min(encode_time, time.perf_counter() - start)
+
+                start = time.perf_counter()
+                decoded = decode(frame)
+                decode_time = min(decode_time, time.perf_counter() - start)
+                assert decoded == users
+
+                # A job that only needs one numeric column
+                start = time.perf_counter()
+                if codec == "records":
+                    total = sum(decode(frame, lazy=True).column("id"))
+                else:
+                    total = sum(user["id"] for user in decode(frame))
+                lazy_time = min(lazy_time, time.perf_counter() - start)
+                assert total == expected_ids
+
+            megabytes = len(frame) / 2**20
+            print(f"{label:>16}: {megabytes:6.2f} MB, encode {encode_time * 1e3:7.1f} ms, "
+                  f"decode {decode_time * 1e3:7.1f} ms, sum(id) {lazy_time * 1e3:7.1f} ms")
+
+
+if __name__ == "__main__":
+    user_data = {"id": 123, "name": "Alice", "email": "alice@example.com"}
+    cache_and_process_data(user_data)
+    cache_and_process_data(user_data, codec="records")
+    cache_and_process_data(make_users(3), codec="records", compress=True)
+    try:
+        encode([{"id": "x", "name": "a", "email": "b"}], "records")
+    except CodecError as e:
+        print(f"Codec error: {e}")
+    benchmark()
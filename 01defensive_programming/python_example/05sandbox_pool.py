@@ -0,0 +1,330 @@
+
+# Sandboxed Worker Pool: drop_priveleges in 05principleleastprivelege.py calls
+# os.seteuid(1000) for the whole process. That is all-or-nothing: the process
+# cannot keep root for its own work while running untrusted tasks unprivileged,
+# and since only the effective uid changes, the code can switch back with
+# os.seteuid(0). Isolating each task therefore means starting a new process per
+# task, which costs far more than most tasks.
+#
+# The pool below forks its workers from the already-initialized parent. Each
+# worker drops privileges once and for good (setgroups/setgid/setuid, so the
+# real and saved ids change too), optionally lowers its resource limits, and
+# then serves many tasks over a pair of pipes. Tasks are pickled by the
+# trusted parent; functions are sent by reference, so a task must be a
+# module-level function. Replies come from code we do not trust, so they are
+# never unpickled: a worker sends length-prefixed JSON, the parent checks its
+# size and shape, and a task's result must therefore be JSON-compatible
+# (tuples come back as lists). A worker keeps no file descriptors but its own
+# two pipe ends, so it cannot reach the other workers.
+#
+# Unix only. Workers are forked before any pool thread starts; a worker that
+# dies, or sends a malformed reply, fails its current task with
+# WorkerCrashedError and is not replaced. Once every worker is gone, pending
+# and new tasks fail with WorkerCrashedError.
+
+import builtins
+import hashlib
+import json
+import os
+import pickle
+import queue
+import resource
+import signal
+import struct
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+REPLY_LENGTH = struct.Struct("<I")
+MAX_REPLY = 64 * 2**20
+
+
+class WorkerCrashedError(Exception):
+    """Exception raised when a worker exits while running a task"""
+    pass
+
+
+# Example #1: Dropping privileges permanently
+
+def drop_privileges(uid=None, gid=None, rlimits=None):
+    """Apply rlimits, then switch to uid/gid for good (only possible as root).
+
+    rlimits maps resource.RLIMIT_* constants to (soft, hard) tuples. They are
+    set first, while we may still raise hard limits.
+    """
+    for limit, values in (rlimits or {}).items():
+        resource.setrlimit(limit, values)
+    if os.getuid() != 0 or uid is None:
+        return
+    gid = uid if gid is None else gid
+    os.setgroups([])
+    os.setgid(gid)
+    os.setuid(uid)  # sets real, effective and saved uid: there is no way back
+    if os.geteuid() == 0:
+        raise RuntimeError("Failed to drop root privileges")
+
+
+# Example #2: The worker loop and its replies
+
+def _write_reply(result_writer, success, value):
+    if success:
+        reply = {"result": value}
+    else:
+        reply = {"error": [type(value).__name__, str(value)]}
+    try:
+        payload = json.dumps(reply).encode("utf-8")
+    except (TypeError, ValueError) as e:
+        payload = json.dumps({"error": ["TypeError", f"Task result is not JSON-compatible: {e}"]}).encode("utf-8")
+    result_writer.write(REPLY_LENGTH.pack(len(payload)) + payload)
+    result_writer.flush()
+
+
+def _read_reply(result_reader):
+    """Read one reply; returns (success, value). Raises EOFError, ValueError or RecursionError.
+
+    The reply is untrusted input: it is size-limited, parsed as JSON only, and
+    an error reply becomes a builtin exception carrying the worker's message.
+    """
+    header = result_reader.read(REPLY_LENGTH.size)
+    if len(header) < REPLY_LENGTH.size:
+        raise EOFError("Worker closed its result pipe")
+    (length,) = REPLY_LENGTH.unpack(header)
+    if length > MAX_REPLY:
+        raise ValueError(f"Reply of {length} bytes exceeds {MAX_REPLY}")
+    payload = result_reader.read(length)
+    if len(payload) < length:
+        raise EOFError("Worker closed its result pipe")
+    reply = json.loads(payload)
+    if isinstance(reply, dict) and reply.keys() == {"result"}:
+        return True, reply["result"]
+    if (isinstance(reply, dict) and reply.keys() == {"error"} and isinstance(reply["error"], list)
+            and len(reply["error"]) == 2 and all(isinstance(part, str) for part in reply["error"])):
+        name, message = reply["error"]
+        error_type = getattr(builtins, name, None)
+        if isinstance(error_type, type) and issubclass(error_type, Exception):
+            try:
+                return False, error_type(message)
+            except Exception:
+                pass
+        return False, RuntimeError(f"{name}: {message}")
+    raise ValueError("Reply is not a result or an error")
+
+
+def _serve(task_reader, result_writer):
+    while True:
+        try:
+            task = pickle.load(task_reader)
+        except EOFError:
+            return
+        if task is None:
+            return
+        func, args, kwargs = task
+        try:
+            _write_reply(result_writer, True, func(*args, **kwargs))
+        except Exception as e:
+            _write_reply(result_writer, False, e)
+
+
+def _fork_worker(uid, gid, rlimits):
+    task_read, task_write = os.pipe()
+    result_read, result_write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        status = 0
+        try:
+            # Close everything inherited from the parent except stdio and our
+            # own pipe ends, including the pipes of previously forked workers
+            low, high = sorted((task_read, result_write))
+            os.closerange(3, low)
+            os.closerange(low + 1, high)
+            os.closerange(high + 1, os.sysconf("SC_OPEN_MAX"))
+            drop_privileges(uid, gid, rlimits)
+            _serve(os.fdopen(task_read, "rb"), os.fdopen(result_write, "wb"))
+        except BaseException:
+            status = 1
+        finally:
+            os._exit(status)  # never return into the parent's code
+    os.close(task_read)
+    os.close(result_write)
+    return pid, os.fdopen(task_write, "wb"), os.fdopen(result_read, "rb")
+
+
+# Example #3: The pool
+# One thread per worker takes tasks from a shared queue, writes them to its
+# worker and waits for the reply. The threads spend their time blocked on pipes,
+# so the GIL is not a bottleneck.
+
+class SandboxPool:
+    def __init__(self, workers=4, uid=None, gid=None, rlimits=None):
+        if workers <= 0:
+            raise ValueError("workers must be positive")
+        self._tasks = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._workers = [_fork_worker(uid, gid, rlimits) for _ in range(workers)]
+        self._alive = len(self._workers)
+        self._threads = [threading.Thread(target=self._dispatch, args=worker, daemon=True)
+                         for worker in self._workers]
+        self._closed = False
+        for thread in self._threads:
+            thread.start()
+
+    def _dispatch(self, pid, task_writer, result_reader):
+        while True:
+            item = self._tasks.get()
+            if item is None:
+                break
+            future, task = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                task_writer.write(task)
+                task_writer.flush()
+                success, value = _read_reply(result_reader)
+            except (EOFError, OSError) as e:
+                future.set_exception(WorkerCrashedError(f"Worker {pid} died: {e!r}"))
+                self._worker_lost()
+                break
+            except (ValueError, RecursionError) as e:
+                # Garbage, deeply nested JSON or an oversized reply: the worker is not trustworthy any more
+                os.kill(pid, signal.SIGKILL)
+                future.set_exception(WorkerCrashedError(f"Worker {pid} sent a malformed reply: {e}"))
+                self._worker_lost()
+                break
+            if success:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+        try:
+            pickle.dump(None, task_writer)
+            task_writer.close()
+        except OSError:
+            pass
+        result_reader.close()
+        os.waitpid(pid, 0)
+
+    def _worker_lost(self):
+        with self._lock:
+            self._alive -= 1
+            if self._alive:
+                return
+        # No worker is left to take queued tasks; submit() now fails new ones
+        while True:
+            try:
+                item = self._tasks.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None and item[0].set_running_or_notify_cancel():
+                item[0].set_exception(WorkerCrashedError("All workers have died"))
+
+    def submit(self, func, *args, **kwargs):
+        if self._closed:
+            raise RuntimeError("Pool is closed")
+        # Pickled here, so an unpicklable task fails in the caller and never
+        # leaves half a message in a worker's pipe
+        task = pickle.dumps((func, args, kwargs), pickle.HIGHEST_PROTOCOL)
+        future = Future()
+        with self._lock:
+            if self._alive:
+                self._tasks.put((future, task))
+                return future
+        future.set_exception(WorkerCrashedError("All workers have died"))
+        return future
+
+    def map(self, func, iterable):
+        futures = [self.submit(func, item) for item in iterable]
+        return [future.result() for future in futures]
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._threads:
+            self._tasks.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Example #4: Tasks
+
+def whoami(_=None):
+    return os.getuid(), os.geteuid(), os.getgid()
+
+
+def digest(payload):
+    return hashlib.sha256(payload).hexdigest()
+
+
+def read_secret(path):
+    with open(path) as file:
+        return file.read()
+
+
+# Example #5: Throughput, prefork pool vs a new process per task
+
+def _fork_per_task(func, arg, uid):
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            drop_privileges(uid)
+            with os.fdopen(write_fd, "wb") as out:
+                _write_reply(out, True, func(arg))
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+    with os.fdopen(read_fd, "rb") as result:
+        _, value = _read_reply(result)
+    os.waitpid(pid, 0)
+    return value
+
+
+def _interpreter_per_task(payload):
+    code = "import hashlib, sys; print(hashlib.sha256(sys.stdin.buffer.read()).hexdigest())"
+    return subprocess.run([sys.executable, "-c", code], input=payload,
+                          capture_output=True, check=True).stdout.decode().strip()
+
+
+def benchmark(n=5_000, uid=65534):
+    payloads = [os.urandom(256) for _ in range(n)]
+    expected = [digest(p) for p in payloads]
+    effective_uid = uid if os.getuid() == 0 else os.getuid()
+    print(f"{os.cpu_count()} CPU(s), {n:,} sha256 tasks, workers run as uid {effective_uid}")
+
+    for workers in (1, 4):
+        start = time.perf_counter()
+        with SandboxPool(workers, uid=uid) as pool:
+            results = pool.map(digest, payloads)
+        elapsed = time.perf_counter() - start
+        assert results == expected
+        print(f"{f'SandboxPool, {workers} workers':>28}: {n / elapsed:10,.0f} tasks/sec")
+
+    start = time.perf_counter()
+    results = [_fork_per_task(digest, p, uid) for p in payloads[:n // 5]]
+    elapsed = time.perf_counter() - start
+    assert results == expected[:n // 5]
+    print(f"{'fork per task':>28}: {n // 5 / elapsed:10,.0f} tasks/sec")
+
+    start = time.perf_counter()
+    results = [_interpreter_per_task(p) for p in payloads[:n // 50]]
+    elapsed = time.perf_counter() - start
+    assert results == expected[:n // 50]
+    print(f"{'new interpreter per task':>28}: {n // 50 / elapsed:10,.0f} tasks/sec")
+
+
+if __name__ == "__main__":
+    with SandboxPool(2, uid=65534, rlimits={resource.RLIMIT_NOFILE: (64, 64)}) as pool:
+        print("parent:", whoami(), "workers:", pool.map(whoami, range(2)))
+        try:
+            print(pool.submit(read_secret, "/etc/shadow").result())
+        except PermissionError as e:
+            print(f"Sandboxed task was denied: {e}")
+    benchmark()
@@ -0,0 +1,341 @@
+
+# Secure Scratch Buffers: process_user_upload, use_temporary_credentials and
+# cache_and_process_data in 05principleleastprivelege.py write a few bytes to
+# tempfile.NamedTemporaryFile, seek back and read them again. Every call creates
+# and deletes a named file in /tmp, where it is visible to other processes for
+# its lifetime, and the data is left behind in freed page cache or disk blocks.
+#
+# ScratchBuffer keeps payloads up to `threshold` bytes in a private bytearray and
+# only spills larger ones to an unnamed 0600 temporary file. If a caller needs a
+# real file descriptor (fileno()), small payloads move to an anonymous memfd
+# (Linux) instead of the disk. On close the contents are overwritten with zeros.
+#
+# Zeroing is best effort: it covers the buffers ScratchBuffer owns. Copies the
+# caller makes (bytes returned by read(), str objects in text mode) are ordinary
+# Python objects, and overwriting a file does not guarantee the old blocks are
+# gone from an SSD or a journaling filesystem.
+
+import ctypes
+import io
+import os
+import secrets
+import tempfile
+import time
+from contextlib import contextmanager
+
+DEFAULT_THRESHOLD = 8 * 1024 * 1024
+_WIPE_CHUNK = 1024 * 1024
+
+
+# Example #1: The buffer
+
+def _zero(buffer, size):
+    """Overwrite the first size bytes of a bytearray in place."""
+    if size:
+        view = (ctypes.c_char * size).from_buffer(buffer)
+        ctypes.memset(view, 0, size)
+        del view
+
+
+# Fresh multi-megabyte allocations cost a page fault per 4 KB page, which is
+# more than the copy itself. Wiped buffers are kept for reuse; everything past
+# a buffer's logical size is always zero. A buffer that a getbuffer() view
+# still points into is never reused, or the view would see the next owner's data.
+_free_buffers = []
+_MAX_FREE_BUFFERS = 4
+
+
+def _has_exports(buffer):
+    """True while a memoryview (or other buffer export) of the bytearray is alive."""
+    try:
+        buffer.append(0)  # resizing is refused while the buffer is exported
+    except BufferError:
+        return True
+    del buffer[-1]
+    return False
+
+
+class ScratchBuffer(io.BufferedIOBase):
+    """Binary read/write scratch space: memory first, a 0600 temp file above threshold."""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, dir=None):
+        self.threshold = threshold
+        self.dir = dir
+        try:
+            self._data = _free_buffers.pop()
+        except IndexError:
+            self._data = bytearray()
+        self._size = 0
+        self._pos = 0
+        self._file = None  # unbuffered FileIO once spilled or moved to a memfd
+
+    @property
+    def spilled(self):
+        return self._file is not None
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    # Moving out of memory
+
+    def _move_to(self, file):
+        file.write(memoryview(self._data)[:self._size])
+        file.seek(self._pos)
+        self._wipe_memory()
+        self._file = file
+
+    def _spill(self):
+        # TemporaryFile uses O_TMPFILE or mkstemp + unlink: mode 0600, no name in /tmp
+        self._move_to(tempfile.TemporaryFile("w+b", buffering=0, dir=self.dir))
+
+    def fileno(self):
+        """Return a real descriptor, moving an in-memory payload into a memfd if possible."""
+        if self._file is None:
+            if hasattr(os, "memfd_create") and self._size <= self.threshold:
+                fd = os.memfd_create("scratch", os.MFD_CLOEXEC)
+                self._move_to(io.FileIO(fd, "w+b"))
+            else:
+                self._spill()
+        return self._file.fileno()
+
+    def _reserve(self, size):
+        # Grow into a new buffer and wipe the old one; bytearray.extend could
+        # realloc and free the old copy without clearing it
+        capacity = len(self._data)
+        if size <= capacity:
+            return
+        grown = bytearray(max(size, 2 * capacity, 4096))
+        grown[:self._size] = memoryview(self._data)[:self._size]
+        _zero(self._data, self._size)
+        self._data = grown
+
+    # File API
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        if self._file is not None:
+            return self._file.write(data)
+        size = len(data)
+        if not size:
+            return 0
+        end = self._pos + size
+        if end > self.threshold:
+            self._spill()
+            return self._file.write(data)
+        self._reserve(end)
+        self._data[self._pos:end] = data  # same length: an in-place copy
+        self._pos = end
+        self._size = max(self._size, end)
+        return size
+
+    def read(self, size=-1):
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        if self._file is not None:
+            return self._file.readall() if size is None or size < 0 else self._file.read(size)
+        end = self._size if size is None or size < 0 else min(self._size, self._pos + size)
+        if end <= self._pos:
+            return b""
+        chunk = memoryview(self._data)[self._pos:end].tobytes()
+        self._pos = end
+        return chunk
+
+    read1 = read
+
+    def readinto(self, buffer):
+        if self._file is not None:
+            return self._file.readinto(buffer)
+        view = memoryview(buffer).cast("B")
+        size = max(0, min(len(view), self._size - self._pos))
+        view[:size] = memoryview(self._data)[self._pos:self._pos + size]
+        self._pos += size
+        return size
+
+    def readline(self, size=-1):
+        if self._file is not None:
+            return self._file.readline(size)
+        end = self._data.find(b"\n", self._pos, self._size)
+        end = self._size if end < 0 else end + 1
+        if size is not None and size >= 0:
+            end = min(end, self._pos + size)
+        if end <= self._pos:
+            return b""
+        line = memoryview(self._data)[self._pos:end].tobytes()
+        self._pos = end
+        return line
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if self._file is not None:
+            return self._file.seek(offset, whence)
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self._size}[whence]
+        if base + offset < 0:
+            raise ValueError(f"negative seek position {base + offset}")
+        self._pos = base + offset
+        return self._pos
+
+    def tell(self):
+        return self._file.tell() if self._file is not None else self._pos
+
+    def truncate(self, size=None):
+        if self._file is not None:
+            return self._file.truncate(size)
+        size = self._pos if size is None else size
+        if size < self._size:
+            self._data[size:self._size] = bytes(self._size - size)
+        else:
+            self._reserve(size)
+        self._size = size
+        return size
+
+    def getbuffer(self):
+        """Zero-copy view of an in-memory payload (release it before writing or closing)."""
+        if self._file is not None:
+            raise ValueError("Buffer has been spilled to a file")
+        return memoryview(self._data)[:self._size]
+
+    # Wiping
+
+    def _wipe_memory(self):
+        _zero(self._data, self._size)
+        if (0 < len(self._data) <= self.threshold and len(_free_buffers) < _MAX_FREE_BUFFERS
+                and not _has_exports(self._data)):
+            _free_buffers.append(self._data)
+        self._data = bytearray()
+        self._size = self._pos = 0
+
+    def _wipe_file(self):
+        fd = self._file.fileno()
+        size = os.fstat(fd).st_size
+        zeros = bytes(min(size, _WIPE_CHUNK))
+        for offset in range(0, size, _WIPE_CHUNK):
+            os.pwrite(fd, zeros[:size - offset], offset)
+        self._file.close()
+        self._file = None
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._file is not None:
+                self._wipe_file()
+            self._wipe_memory()
+        finally:
+            super().close()
+
+
+# Example #2: A drop-in for NamedTemporaryFile(mode='w+t' / 'w+b')
+
+@contextmanager
+def scratch_file(mode="w+b", threshold=DEFAULT_THRESHOLD, encoding="utf-8", dir=None):
+    if mode not in ("w+b", "w+t", "w+"):
+        raise ValueError(f"Unsupported mode {mode!r}")
+    buffer = ScratchBuffer(threshold, dir)
+    try:
+        if mode == "w+b":
+            yield buffer
+        else:
+            text = io.TextIOWrapper(buffer, encoding=encoding, write_through=True)
+            try:
+                yield text
+            finally:
+                text.detach()
+    finally:
+        buffer.close()
+
+
+# Example #3: The examples from 05principleleastprivelege.py, same API
+
+def reverse_text(text):
+    """Simple function to reverse text."""
+    return text[::-1]
+
+
+def process_user_upload(uploaded_text):
+    """Process uploaded text document securely."""
+    with scratch_file(mode='w+t') as temp_file:
+        temp_file.write(uploaded_text)
+        temp_file.seek(0)
+
+        content = temp_file.read()
+        processed_content = reverse_text(content)
+
+        print(f"Processed Content: {processed_content}")
+
+
+def generate_api_key():
+    """Generate a secure, random API key."""
+    return secrets.token_hex(16)
+
+
+def use_temporary_credentials():
+    """Generate and use temporary credentials securely."""
+    api_key = generate_api_key()
+    with scratch_file(mode='w+t') as temp_file:
+        temp_file.write(f"Api_key={api_key}")
+        temp_file.seek(0)
+
+        credentials = temp_file.readline().strip()
+        print(f"Using credentials: {credentials} for temporary access.")
+
+
+def cache_and_process_data(data):
+    """Cache data temporarily and process it in a background job."""
+    import json
+
+    with scratch_file(mode='w+t') as temp_file:
+        json.dump(data, temp_file)
+        temp_file.seek(0)
+
+        processed_data = json.load(temp_file)
+        print(f"Background job processed data: {processed_data}")
+
+
+# Example #4: Round-trip benchmark, 1 KB to 1 GB
+
+def _round_trip(factory, payload):
+    with factory() as file:
+        file.write(payload)
+        file.seek(0)
+        return len(file.read())
+
+
+def benchmark(sizes=(1 << 10, 64 << 10, 1 << 20, 16 << 20, 256 << 20, 1 << 30)):
+    factories = {
+        "NamedTemporaryFile": lambda: tempfile.NamedTemporaryFile("w+b"),
+        "scratch_file": scratch_file,
+    }
+    for size in sizes:
+        payload = os.urandom(size)
+        repeat = max(1, min(2_000, (64 << 20) // size))
+        line = []
+        for name, factory in factories.items():
+            start = time.perf_counter()
+            for _ in range(repeat):
+                assert _round_trip(factory, payload) == size
+            elapsed = (time.perf_counter() - start) / repeat
+            line.append(f"{name} {elapsed * 1e6:12,.1f} us")
+        label = f"{size >> 20} MB" if size >= 1 << 20 else f"{size >> 10} KB"
+        print(f"{label:>8}: " + ", ".join(line))
+        del payload
+
+
+if __name__ == "__main__":
+    process_user_upload("Sensitive information here.")
+    use_temporary_credentials()
+    cache_and_process_data({"id": 123, "name": "Alice", "email": "alice@example.com"})
+
+    with scratch_file(threshold=16) as buffer:
+        buffer.write(b"short")
+        print("spilled:", buffer.spilled)
+        buffer.write(b" and then a lot longer")
+        mode = os.fstat(buffer.fileno()).st_mode & 0o777
+        print("spilled:", buffer.spilled, "file mode:", oct(mode))
+
+    benchmark()
@@ -0,0 +1,505 @@
+
+# Persistent Configuration Map: WebServerConfig in 06immutable_data.py is a frozen
+# dataclass with three fields. A real server config has thousands of keys and is
+# replaced at runtime; with a frozen dataclass or a dict, every reload that
+# changes one key copies all of them, and finding out what changed means
+# comparing every key of the old and new versions.
+#
+# PersistentMap is a hash array mapped trie (HAMT). Keys are placed by their
+# hash, 5 bits per level, in nodes of up to 32 entries that only store the
+# entries present (a 32-bit bitmap says which). set and delete copy the
+# O(log32 n) nodes on the path to the key and share all other nodes with the
+# previous version, so old versions stay valid and cost almost nothing to keep.
+# A map is immutable, so a snapshot is the map itself. diff skips every subtree
+# the two versions share, so its cost follows the number of changes, not the size.
+#
+# FrozenConfig puts a frozen-dataclass-style attribute facade on top.
+
+import random
+import time
+import tracemalloc
+from collections.abc import ItemsView, Mapping, ValuesView
+from dataclasses import FrozenInstanceError
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_HASH_MASK = (1 << 64) - 1
+
+
+class _Missing:
+    def __repr__(self):
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+
+# Example #1: Trie nodes
+# A _Node holds a bitmap and a tuple of children, one per set bit, in bit order.
+# A child is a _Leaf, a nested _Node, or a _Collision (keys with equal hashes).
+
+class _Leaf:
+    __slots__ = ("hash", "key", "value")
+
+    def __init__(self, hash_, key, value):
+        self.hash = hash_
+        self.key = key
+        self.value = value
+
+
+class _Node:
+    __slots__ = ("bitmap", "items")
+
+    def __init__(self, bitmap, items):
+        self.bitmap = bitmap
+        self.items = items
+
+
+class _Collision:
+    __slots__ = ("hash", "leaves")
+
+    def __init__(self, hash_, leaves):
+        self.hash = hash_
+        self.leaves = leaves
+
+
+_EMPTY = _Node(0, ())
+
+
+def _hash(key):
+    return hash(key) & _HASH_MASK
+
+
+def _get(node, h, key, default):
+    shift = 0
+    while True:
+        kind = type(node)
+        if kind is _Node:
+            bit = 1 << ((h >> shift) & _MASK)
+            if not node.bitmap & bit:
+                return default
+            node = node.items[(node.bitmap & (bit - 1)).bit_count()]
+            shift += _BITS
+        elif kind is _Leaf:
+            if node.hash == h and (node.key is key or node.key == key):
+                return node.value
+            return default
+        else:
+            for leaf in node.leaves:
+                if leaf.key is key or leaf.key == key:
+                    return leaf.value
+            return default
+
+
+def _merge(a, b, shift):
+    """A node holding two leaves (or collisions) with different hashes."""
+    bit_a = (a.hash >> shift) & _MASK
+    bit_b = (b.hash >> shift) & _MASK
+    if bit_a == bit_b:
+        return _Node(1 << bit_a, (_merge(a, b, shift + _BITS),))
+    items = (a, b) if bit_a < bit_b else (b, a)
+    return _Node((1 << bit_a) | (1 << bit_b), items)
+
+
+def _assoc(node, shift, h, key, value):
+    """Return (new node, whether a key was added). Returns node itself if nothing changed."""
+    kind = type(node)
+    if kind is _Node:
+        bit = 1 << ((h >> shift) & _MASK)
+        index = (node.bitmap & (bit - 1)).bit_count()
+        items = node.items
+        if not node.bitmap & bit:
+            return _Node(node.bitmap | bit, items[:index] + (_Leaf(h, key, value),) + items[index:]), True
+        child = items[index]
+        new_child, added = _assoc(child, shift + _BITS, h, key, value)
+        if new_child is child:
+            return node, False
+        return _Node(node.bitmap, items[:index] + (new_child,) + items[index + 1:]), added
+    if kind is _Leaf:
+        if node.hash == h and (node.key is key or node.key == key):
+            if node.value is value:
+                return node, False
+            return _Leaf(h, key, value), False
+        if node.hash == h:
+            return _Collision(h, (node, _Leaf(h, key, value))), True
+        return _merge(node, _Leaf(h, key, value), shift), True
+    if node.hash != h:
+        return _merge(node, _Leaf(h, key, value), shift), True
+    leaves = node.leaves
+    for i, leaf in enumerate(leaves):
+        if leaf.key is key or leaf.key == key:
+            if leaf.value is value:
+                return node, False
+            return _Collision(h, leaves[:i] + (_Leaf(h, key, value),) + leaves[i + 1:]), False
+    return _Collision(h, leaves + (_Leaf(h, key, value),)), True
+
+
+def _dissoc(node, shift, h, key):
+    """Return the node without key: None if it became empty, node itself if key is absent."""
+    kind = type(node)
+    if kind is _Node:
+        bit = 1 << ((h >> shift) & _MASK)
+        if not node.bitmap & bit:
+            return node
+        index = (node.bitmap & (bit - 1)).bit_count()
+        items = node.items
+        child = items[index]
+        new_child = _dissoc(child, shift + _BITS, h, key)
+        if new_child is child:
+            return node
+        if new_child is None:
+            if node.bitmap == bit:
+                return None
+            items = items[:index] + items[index + 1:]
+            bitmap = node.bitmap & ~bit
+            # A lone leaf moves up, so the trie looks as if it was never split
+            if shift and len(items) == 1 and type(items[0]) is not _Node:
+                return items[0]
+            return _Node(bitmap, items)
+        if shift and len(items) == 1 and type(new_child) is not _Node:
+            return new_child
+        return _Node(node.bitmap, items[:index] + (new_child,) + items[index + 1:])
+    if kind is _Leaf:
+        if node.hash == h and (node.key is key or node.key == key):
+            return None
+        return node
+    if node.hash != h:
+        return node
+    leaves = tuple(leaf for leaf in node.leaves if not (leaf.key is key or leaf.key == key))
+    if len(leaves) == len(node.leaves):
+        return node
+    return leaves[0] if len(leaves) == 1 else _Collision(h, leaves)
+
+
+def _leaves(node):
+    kind = type(node)
+    if kind is _Node:
+        for item in node.items:
+            if type(item) is _Leaf:
+                yield item
+            else:
+                yield from _leaves(item)
+    elif kind is _Leaf:
+        yield node
+    else:
+        yield from node.leaves
+
+
+def _build(leaves, shift):
+    """Build a subtree from leaves with distinct keys in one pass (no path copying)."""
+    if len(leaves) == 1:
+        return leaves[0]
+    buckets = {}
+    for leaf in leaves:
+        bit = (leaf.hash >> shift) & _MASK
+        if bit in buckets:
+            buckets[bit].append(leaf)
+        else:
+            buckets[bit] = [leaf]
+    if len(buckets) == 1:
+        first = leaves[0].hash
+        if all(leaf.hash == first for leaf in leaves):
+            return _Collision(first, tuple(leaves))
+    bitmap = 0
+    items = []
+    for bit in sorted(buckets):
+        group = buckets[bit]
+        bitmap |= 1 << bit
+        items.append(group[0] if len(group) == 1 else _build(group, shift + _BITS))
+    return _Node(bitmap, tuple(items))
+
+
+def _diff(a, b, shift, changes):
+    if a is b:
+        return
+    if type(a) is _Node and type(b) is _Node:
+        bits = a.bitmap | b.bitmap
+        while bits:
+            bit = bits & -bits
+            bits ^= bit
+            child_a = a.items[(a.bitmap & (bit - 1)).bit_count()] if a.bitmap & bit else None
+            child_b = b.items[(b.bitmap & (bit - 1)).bit_count()] if b.bitmap & bit else None
+            if child_a is not child_b:
+                _diff(child_a, child_b, shift + _BITS, changes)
+        return
+    # Different shapes (or a side is missing): compare the few leaves directly
+    old = {leaf.key: leaf.value for leaf in _leaves(a)} if a is not None else {}
+    new = {leaf.key: leaf.value for leaf in _leaves(b)} if b is not None else {}
+    for key, value in old.items():
+        other = new.get(key, MISSING)
+        if other is MISSING or not (other is value or other == value):
+            changes[key] = (value, other)
+    for key, value in new.items():
+        if key not in old:
+            changes[key] = (MISSING, value)
+
+
+# Example #2: The map
+
+class _ItemsView(ItemsView):
+    def __iter__(self):
+        for leaf in _leaves(self._mapping._root):
+            yield leaf.key, leaf.value
+
+
+class _ValuesView(ValuesView):
+    def __iter__(self):
+        for leaf in _leaves(self._mapping._root):
+            yield leaf.value
+
+
+class PersistentMap(Mapping):
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, mapping=(), **kwargs):
+        entries = dict(mapping, **kwargs)
+        root = _build([_Leaf(_hash(k), k, v) for k, v in entries.items()], 0) if entries else _EMPTY
+        if type(root) is not _Node:  # the root is always a node
+            root = _Node(0, ()) if not entries else _Node(1 << (root.hash & _MASK), (root,))
+        object.__setattr__(self, "_root", root)
+        object.__setattr__(self, "_size", len(entries))
+
+    @classmethod
+    def _from_root(cls, root, size):
+        new = cls.__new__(cls)
+        object.__setattr__(new, "_root", root)
+        object.__setattr__(new, "_size", size)
+        return new
+
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    __delattr__ = __setattr__
+
+    def __reduce__(self):
+        # copy, deepcopy and pickle rebuild the trie from the items
+        return type(self), (dict(self.items()),)
+
+    # Reads
+
+    def __getitem__(self, key):
+        value = _get(self._root, _hash(key), key, MISSING)
+        if value is MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        return _get(self._root, _hash(key), key, default)
+
+    def __contains__(self, key):
+        return _get(self._root, _hash(key), key, MISSING) is not MISSING
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for leaf in _leaves(self._root):
+            yield leaf.key
+
+    def items(self):
+        return _ItemsView(self)
+
+    def values(self):
+        return _ValuesView(self)
+
+    def __eq__(self, other):
+        if isinstance(other, PersistentMap) and other._root is self._root:
+            return True
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"PersistentMap({dict(self.items())!r})"
+
+    # New versions
+
+    def set(self, key, value):
+        root, added = _assoc(self._root, 0, _hash(key), key, value)
+        if root is self._root:
+            return self
+        return PersistentMap._from_root(root, self._size + added)
+
+    def delete(self, key):
+        root = _dissoc(self._root, 0, _hash(key), key)
+        if root is self._root:
+            raise KeyError(key)
+        return PersistentMap._from_root(root if root is not None else _EMPTY, self._size - 1)
+
+    def discard(self, key):
+        try:
+            return self.delete(key)
+        except KeyError:
+            return self
+
+    def update(self, mapping=(), **kwargs):
+        result = self
+        for key, value in dict(mapping, **kwargs).items():
+            result = result.set(key, value)
+        return result
+
+    def snapshot(self):
+        """Maps never change, so a snapshot is free: it is the map itself."""
+        return self
+
+    def diff(self, other):
+        """Return {key: (value here, value in other)}; MISSING marks an absent key."""
+        changes = {}
+        _diff(self._root, other._root, 0, changes)
+        return changes
+
+
+# Example #3: A frozen attribute facade for configurations
+
+class FrozenConfig:
+    """Read-only attribute access over a PersistentMap, like a frozen dataclass.
+
+    Keys that are not valid identifiers, start with an underscore, or clash
+    with the methods below, are read with config["key"].
+    """
+    __slots__ = ("_data",)
+    required = ()
+
+    def __init__(self, data=(), **fields):
+        data = data if isinstance(data, PersistentMap) and not fields else PersistentMap(data, **fields)
+        missing = [name for name in self.required if name not in data]
+        if missing:
+            raise TypeError(f"{type(self).__name__}() missing required fields: {', '.join(missing)}")
+        object.__setattr__(self, "_data", data)
+
+    def __getattr__(self, name):
+        # Underscore names are never fields: copy and pickle probe for
+        # __deepcopy__ and friends, sometimes before _data is set
+        if name.startswith("_"):
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}") from None
+
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    __delattr__ = __setattr__
+
+    def __reduce__(self):
+        return type(self), (self._data,)
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __len__(self):
+        return len(self._data)
+
+    def as_map(self):
+        return self._data
+
+    def replace(self, **changes):
+        """Like dataclasses.replace: a new config with some fields changed."""
+        return type(self)(self._data.update(changes))
+
+    def with_values(self, mapping):
+        """Same as replace, for keys that are not identifiers."""
+        return type(self)(self._data.update(mapping))
+
+    def diff(self, other):
+        return self._data.diff(other._data)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._data == other._data
+
+    __hash__ = None
+
+    def __repr__(self):
+        items = list(self._data.items())
+        shown = ", ".join(f"{key}={value!r}" for key, value in items[:10])
+        more = f", ... {len(items) - 10} more" if len(items) > 10 else ""
+        return f"{type(self).__name__}({shown}{more})"
+
+
+class WebServerConfig(FrozenConfig):
+    __slots__ = ()
+    required = ("port", "ssl_enabled", "root_dir")
+
+
+# Example #4: Benchmark against dict copies
+
+def _current_memory(build):
+    tracemalloc.start()
+    try:
+        kept = build()
+        return kept, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark(sizes=(10**3, 10**4, 10**5, 10**6), versions=10, changes=10):
+    rng = random.Random(5)
+    for size in sizes:
+        data = {f"server.option_{i}": i for i in range(size)}
+        keys = list(data)
+
+        start = time.perf_counter()
+        base = PersistentMap(data)
+        build_time = time.perf_counter() - start
+
+        # One changed key per new version, keeping every version
+        updates = [(rng.choice(keys), -i) for i in range(versions)]
+
+        def dict_versions():
+            history = [data]
+            for key, value in updates:
+                version = dict(history[-1])
+                version[key] = value
+                history.append(version)
+            return history
+
+        def map_versions():
+            history = [base]
+            for key, value in updates:
+                history.append(history[-1].set(key, value))
+            return history
+
+        start = time.perf_counter()
+        dict_versions()
+        dict_time = (time.perf_counter() - start) / versions
+        start = time.perf_counter()
+        map_versions()
+        map_time = (time.perf_counter() - start) / versions
+        dict_memory = _current_memory(dict_versions)[1]
+        map_memory = _current_memory(map_versions)[1]
+
+        changed = base.update({rng.choice(keys): -1 for _ in range(changes)})
+        changed_dict = dict(changed.items())
+        start = time.perf_counter()
+        dict_changes = {k: (v, changed_dict[k]) for k, v in data.items() if changed_dict[k] != v}
+        dict_diff_time = time.perf_counter() - start
+        start = time.perf_counter()
+        map_changes = base.diff(changed)
+        map_diff_time = time.perf_counter() - start
+        assert map_changes == dict_changes
+
+        print(f"{size:>9,} keys: build {build_time * 1e3:8.1f} ms | new version: "
+              f"dict copy {dict_time * 1e6:9.1f} us, set {map_time * 1e6:5.1f} us | "
+              f"{versions} versions: dict {dict_memory / 2**20:7.1f} MB, map {map_memory / 2**10:6.1f} KB | "
+              f"diff of {len(map_changes)}: dict {dict_diff_time * 1e3:7.2f} ms, "
+              f"map {map_diff_time * 1e3:5.2f} ms")
+
+
+if __name__ == "__main__":
+    config = WebServerConfig(port=443, ssl_enabled=True, root_dir="/var/www/html")
+    print(config)
+    try:
+        config.port = 8080
+    except FrozenInstanceError as e:
+        print(e)
+
+    reloaded = config.replace(port=8443, workers=8)
+    print(reloaded, config.diff(reloaded))
+    try:
+        WebServerConfig(port=80)
+    except TypeError as e:
+        print(e)
+    benchmark()
@@ -0,0 +1,255 @@
+
+# Compact Immutable Catalog: Product in 06immutable_data.py is a frozen dataclass,
+# so every product carries its own __dict__ plus separate int and float objects,
+# several hundred bytes per record. Changing a price means dataclasses.replace
+# and, to keep older versions intact, copying the whole list.
+#
+# ProductCatalog stores the fields column by column (struct of arrays): ids and
+# prices in array('q') / array('d'), names in tuples. The columns are split
+# into chunks of CHUNK records. with_price returns a new catalog that copies a
+# single price chunk and the short list of chunk references, and shares
+# everything else (ids, names, other price chunks, the id index) with the
+# previous version. Neither version can be modified.
+#
+# The id index is a dict from id to position, except when the ids form a
+# contiguous range (1..n in any order, the usual case for database keys): the
+# records are then stored in id order and the position is id - first id, so no
+# index is needed at all. Iteration follows storage order.
+
+import operator
+import random
+import time
+import tracemalloc
+from array import array
+from dataclasses import FrozenInstanceError, dataclass, replace
+
+CHUNK_BITS = 10
+CHUNK = 1 << CHUNK_BITS
+MASK = CHUNK - 1
+
+
+@dataclass(frozen=True, slots=True)
+class Product:
+    id: int
+    name: str
+    price: float
+
+
+# Example #1: The catalog
+
+class ProductCatalog:
+    __slots__ = ("_ids", "_names", "_prices", "_index", "_base", "_size")
+
+    def __init__(self, products=()):
+        ids = array("q")
+        names = []
+        prices = array("d")
+        for product in products:
+            ids.append(product.id)
+            names.append(product.name)
+            prices.append(product.price)
+        self._build(ids, names, prices)
+
+    @classmethod
+    def from_columns(cls, ids, names, prices):
+        if not len(ids) == len(names) == len(prices):
+            raise ValueError("ids, names and prices must have the same length")
+        catalog = cls.__new__(cls)
+        catalog._build(array("q", ids), list(names), array("d", prices))
+        return catalog
+
+    def _build(self, ids, names, prices):
+        size = len(ids)
+        index = {product_id: position for position, product_id in enumerate(ids)}
+        if len(index) != size:
+            raise ValueError("Product ids must be unique")
+        base = None
+        if size and max(ids) - min(ids) == size - 1:
+            # Contiguous ids: store in id order and drop the index
+            base = min(ids)
+            order = sorted(range(size), key=ids.__getitem__)
+            ids = array("q", range(base, base + size))
+            names = [names[i] for i in order]
+            prices = array("d", (prices[i] for i in order))
+            index = None
+        chunks = range(0, size, CHUNK)
+        set_ = object.__setattr__
+        set_(self, "_ids", tuple(ids[i:i + CHUNK] for i in chunks))
+        set_(self, "_names", tuple(tuple(names[i:i + CHUNK]) for i in chunks))
+        set_(self, "_prices", tuple(prices[i:i + CHUNK] for i in chunks))
+        set_(self, "_index", index)
+        set_(self, "_base", base)
+        set_(self, "_size", size)
+
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    __delattr__ = __setattr__
+
+    def __reduce__(self):
+        # copy, deepcopy and pickle rebuild the catalog from flat columns
+        ids = array("q")
+        prices = array("d")
+        names = []
+        for chunk_ids, chunk_names, chunk_prices in zip(self._ids, self._names, self._prices):
+            ids.extend(chunk_ids)
+            names.extend(chunk_names)
+            prices.extend(chunk_prices)
+        return type(self).from_columns, (ids, names, prices)
+
+    def _position(self, product_id):
+        # Ids are ints in both layouts: floats such as 2.0 are not ids, even
+        # though 2.0 == 2 would find a dict entry
+        try:
+            product_id = operator.index(product_id)
+        except TypeError:
+            raise KeyError(product_id) from None
+        if self._index is not None:
+            return self._index[product_id]
+        position = product_id - self._base
+        if not 0 <= position < self._size:
+            raise KeyError(product_id)
+        return position
+
+    # Reads
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, product_id):
+        try:
+            self._position(product_id)
+        except KeyError:
+            return False
+        return True
+
+    def __getitem__(self, product_id):
+        position = self._position(product_id)
+        chunk, offset = position >> CHUNK_BITS, position & MASK
+        return Product(self._ids[chunk][offset], self._names[chunk][offset], self._prices[chunk][offset])
+
+    def price(self, product_id):
+        position = self._position(product_id)
+        return self._prices[position >> CHUNK_BITS][position & MASK]
+
+    def name(self, product_id):
+        position = self._position(product_id)
+        return self._names[position >> CHUNK_BITS][position & MASK]
+
+    def __iter__(self):
+        for ids, names, prices in zip(self._ids, self._names, self._prices):
+            yield from map(Product, ids, names, prices)
+
+    # Persistent updates
+
+    def with_price(self, product_id, price):
+        """Return a new catalog with one price changed; this catalog is unchanged."""
+        return self.with_prices({product_id: price})
+
+    def with_prices(self, updates):
+        """Return a new catalog with several prices changed, copying each touched chunk once."""
+        prices = list(self._prices)
+        copied = set()
+        for product_id, price in updates.items():
+            position = self._position(product_id)
+            chunk, offset = position >> CHUNK_BITS, position & MASK
+            if chunk not in copied:
+                prices[chunk] = array("d", prices[chunk])
+                copied.add(chunk)
+            prices[chunk][offset] = price
+        catalog = ProductCatalog.__new__(ProductCatalog)
+        set_ = object.__setattr__
+        for name in ("_ids", "_names", "_index", "_base", "_size"):
+            set_(catalog, name, getattr(self, name))
+        set_(catalog, "_prices", tuple(prices))
+        return catalog
+
+
+# Example #2: Memory and throughput against a list of frozen dataclasses
+
+@dataclass(frozen=True)
+class DataclassProduct:
+    # Product as defined in 06immutable_data.py
+    id: int
+    name: str
+    price: float
+
+
+def _measure(build):
+    tracemalloc.start()
+    try:
+        result = build()
+        return result, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def _rows(n, spacing):
+    # Fresh id, name and price objects for every record, in shuffled order
+    # (7919 is prime, so k * 7919 % n visits every position once)
+    for k in range(n):
+        product_id = (k * 7919 % n) * spacing + 1
+        yield product_id, f"product-{product_id}", product_id % 2000 + 0.99
+
+
+def benchmark(n=1_000_000, lookups=1_000_000, updates=50):
+    for label, spacing in (("contiguous ids", 1), ("sparse ids", 7)):
+        _benchmark_layout(label, n, spacing, lookups, updates)
+
+
+def _benchmark_layout(label, n, spacing, lookups, updates):
+    def build_dataclasses():
+        items = [DataclassProduct(*row) for row in _rows(n, spacing)]
+        return items, {product.id: product for product in items}
+
+    (products, by_id), dataclass_size = _measure(build_dataclasses)
+    catalog, catalog_size = _measure(lambda: ProductCatalog(Product(*row) for row in _rows(n, spacing)))
+    names_size = sum(len(name) + 49 for _, name, _ in _rows(n, spacing))  # compact ASCII str objects
+    print(f"{n:,} products, {label}, bytes per record (the name strings take {names_size / n:.0f}):")
+    print(f"  dataclass list + dict index: {dataclass_size / n:6.0f}")
+    print(f"  ProductCatalog:              {catalog_size / n:6.0f}")
+
+    rng = random.Random(3)
+    keys = [rng.randrange(n) * spacing + 1 for _ in range(lookups)]
+    start = time.perf_counter()
+    total = sum(by_id[key].price for key in keys)
+    dataclass_lookup = time.perf_counter() - start
+    start = time.perf_counter()
+    assert sum(catalog.price(key) for key in keys) == total
+    catalog_lookup = time.perf_counter() - start
+    start = time.perf_counter()
+    for key in keys:
+        catalog[key]
+    record_lookup = time.perf_counter() - start
+    print(f"  lookups/sec: dict of dataclasses {lookups / dataclass_lookup:10,.0f}, "
+          f"catalog.price {lookups / catalog_lookup:10,.0f}, catalog[id] {lookups / record_lookup:10,.0f}")
+
+    # An update that keeps the old version: replace() plus a copy of the list
+    position = {product.id: i for i, product in enumerate(products)}
+    start = time.perf_counter()
+    version = products
+    for key in keys[:updates]:
+        version = list(version)
+        i = position[key]
+        version[i] = replace(version[i], price=0.5)
+    dataclass_update = (time.perf_counter() - start) / updates
+
+    start = time.perf_counter()
+    version = catalog
+    for key in keys[:updates * 1000]:
+        version = version.with_price(key, 0.5)
+    catalog_update = (time.perf_counter() - start) / (updates * 1000)
+    assert version.price(keys[0]) == 0.5 and catalog.price(keys[0]) != 0.5
+    print(f"  updates/sec: dataclass list copy {1 / dataclass_update:10,.0f}, "
+          f"with_price {1 / catalog_update:10,.0f}")
+
+
+if __name__ == "__main__":
+    catalog = ProductCatalog([Product(1, "Laptop", 999.99), Product(2, "Phone", 599.0)])
+    cheaper = catalog.with_price(1, 899.99)
+    print(catalog[1], cheaper[1], list(cheaper))
+    try:
+        catalog._size = 0
+    except FrozenInstanceError as e:
+        print(e)
+    benchmark()
@@ -0,0 +1,269 @@
+
+# Bitset Inventory Sets: inventory_items in 06immutable_data.py is a frozenset of
+# item names. Intersecting and uniting thousands of such sets per second over a
+# fixed catalog of SKUs hashes and compares every member string, and every set
+# stores its own hash table of pointers.
+#
+# SkuUniverse interns SKU names to dense integer ids (0, 1, 2, ...). A SkuSet
+# over that universe is a single Python int used as a bitset: bit i is set when
+# SKU i is a member. Union, intersection and difference are |, & and
+# a ^ (a & b) on those ints, which CPython runs as a loop over machine words in
+# C, with no per-member hashing. The cost follows the size of the universe, not
+# the number of members, so frozenset stays faster for very sparse sets.
+# SkuSets are immutable, hashable and compare equal when they have the same
+# members in the same universe, like frozensets.
+
+import random
+import sys
+import threading
+import time
+import weakref
+
+# For each byte value, the positions of its set bits
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+
+# Example #1: Interning names
+
+class SkuUniverse:
+    """The fixed set of SKUs that SkuSets are drawn from."""
+
+    def __init__(self, names=()):
+        self._ids = {}
+        self._names = []
+        self._lock = threading.Lock()
+        self._interned = weakref.WeakValueDictionary()
+        for name in names:
+            self.id_of(name)
+
+    def __len__(self):
+        return len(self._names)
+
+    def id_of(self, name):
+        """Return the id of name, adding it to the universe if it is new."""
+        try:
+            return self._ids[name]
+        except KeyError:
+            with self._lock:
+                if name not in self._ids:
+                    self._ids[name] = len(self._names)
+                    self._names.append(name)
+                return self._ids[name]
+
+    def name_of(self, sku_id):
+        return self._names[sku_id]
+
+    def set_of(self, names=()):
+        """Build a SkuSet from names; unknown names are added to the universe."""
+        return SkuSet(self, self._bits_of([self.id_of(name) for name in names]))
+
+    def _known_bits(self, names):
+        """Bits for the names already in the universe; unknown names are skipped."""
+        ids = self._ids
+        return self._bits_of([ids[name] for name in names if name in ids])
+
+    @staticmethod
+    def _bits_of(ids):
+        if not ids:
+            return 0
+        # Setting bits in a bytearray and converting once is O(members + size);
+        # or-ing 1 << id into an int would copy the int for every member
+        buffer = bytearray(max(ids) // 8 + 1)
+        for sku_id in ids:
+            buffer[sku_id >> 3] |= 1 << (sku_id & 7)
+        return int.from_bytes(buffer, "little")
+
+    def intern(self, sku_set):
+        """Return the canonical SkuSet with these members, so equal sets can be compared with `is`."""
+        if sku_set._universe is not self:
+            raise ValueError("SkuSet belongs to a different universe")
+        return self._interned.setdefault(sku_set._bits, sku_set)
+
+
+# Example #2: The set type
+
+class SkuSet:
+    __slots__ = ("_universe", "_bits", "__weakref__")
+
+    def __init__(self, universe, bits):
+        object.__setattr__(self, "_universe", universe)
+        object.__setattr__(self, "_bits", bits)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("'SkuSet' object is immutable")
+
+    __delattr__ = __setattr__
+
+    def _check(self, other):
+        if not isinstance(other, SkuSet):
+            return False
+        if other._universe is not self._universe:
+            raise ValueError("Cannot combine SkuSets from different universes")
+        return True
+
+    def _bits_of(self, other):
+        # The named methods accept any iterable of names, like frozenset's.
+        # Names outside the universe cannot be members, so they are skipped.
+        if self._check(other):
+            return other._bits
+        return self._universe._known_bits(other)
+
+    # Membership and iteration
+
+    def __len__(self):
+        return self._bits.bit_count()
+
+    def __bool__(self):
+        return bool(self._bits)
+
+    def __contains__(self, name):
+        sku_id = self._universe._ids.get(name)
+        return sku_id is not None and self._bits >> sku_id & 1 == 1
+
+    def ids(self):
+        """Yield member ids in increasing order."""
+        bits = self._bits
+        data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+        for index, byte in enumerate(data):
+            if byte:
+                base = index << 3
+                for bit in _BYTE_BITS[byte]:
+                    yield base + bit
+
+    def __iter__(self):
+        names = self._universe._names
+        for sku_id in self.ids():
+            yield names[sku_id]
+
+    # Set algebra
+
+    def __or__(self, other):
+        if not self._check(other):
+            return NotImplemented
+        return SkuSet(self._universe, self._bits | other._bits)
+
+    def __and__(self, other):
+        if not self._check(other):
+            return NotImplemented
+        return SkuSet(self._universe, self._bits & other._bits)
+
+    def __sub__(self, other):
+        if not self._check(other):
+            return NotImplemented
+        return SkuSet(self._universe, self._bits ^ (self._bits & other._bits))
+
+    def __xor__(self, other):
+        if not self._check(other):
+            return NotImplemented
+        return SkuSet(self._universe, self._bits ^ other._bits)
+
+    def union(self, *others):
+        bits = self._bits
+        for other in others:
+            # New names join the universe, as in set_of
+            bits |= other._bits if self._check(other) else self._universe.set_of(other)._bits
+        return SkuSet(self._universe, bits)
+
+    def intersection(self, *others):
+        bits = self._bits
+        for other in others:
+            bits &= self._bits_of(other)
+        return SkuSet(self._universe, bits)
+
+    def difference(self, *others):
+        bits = self._bits
+        for other in others:
+            bits ^= bits & self._bits_of(other)
+        return SkuSet(self._universe, bits)
+
+    def isdisjoint(self, other):
+        return not self._bits & self._bits_of(other)
+
+    def issubset(self, other):
+        return self._bits & self._bits_of(other) == self._bits
+
+    def issuperset(self, other):
+        if self._check(other):
+            return other <= self
+        return all(name in self for name in other)
+
+    def __le__(self, other):
+        if not self._check(other):
+            return NotImplemented
+        return self._bits & other._bits == self._bits
+
+    def __lt__(self, other):
+        if not self._check(other):
+            return NotImplemented
+        return self._bits != other._bits and self._bits & other._bits == self._bits
+
+    def __ge__(self, other):
+        if not self._check(other):
+            return NotImplemented
+        return other <= self
+
+    def __gt__(self, other):
+        if not self._check(other):
+            return NotImplemented
+        return other < self
+
+    def __eq__(self, other):
+        if not isinstance(other, SkuSet):
+            return NotImplemented
+        return self._universe is other._universe and self._bits == other._bits
+
+    def __hash__(self):
+        return hash((id(self._universe), self._bits))
+
+    def __repr__(self):
+        return f"SkuSet({{{', '.join(map(repr, self))}}})"
+
+
+# Example #3: Benchmark against frozenset at varying densities
+
+def benchmark(universe_size=100_000, densities=(0.001, 0.01, 0.1, 0.5), pairs=200):
+    names = [f"SKU-{i:06d}" for i in range(universe_size)]
+    universe = SkuUniverse(names)
+    rng = random.Random(11)
+    print(f"universe of {universe_size:,} SKUs, {pairs} random pairs per density")
+    for density in densities:
+        members = [rng.sample(names, int(universe_size * density)) for _ in range(2 * pairs)]
+        frozensets = [frozenset(m) for m in members]
+        start = time.perf_counter()
+        sku_sets = [universe.set_of(m) for m in members]
+        build_time = (time.perf_counter() - start) / len(members)
+
+        timings = {}
+        for label, sets in (("frozenset", frozensets), ("SkuSet", sku_sets)):
+            left, right = sets[:pairs], sets[pairs:]
+            for op_name, op in (("&", lambda a, b: a & b), ("|", lambda a, b: a | b),
+                                ("-", lambda a, b: a - b)):
+                start = time.perf_counter()
+                for a, b in zip(left, right):
+                    op(a, b)
+                timings[label, op_name] = pairs / (time.perf_counter() - start)
+        assert all(set(s) == f for s, f in zip(sku_sets[:5], frozensets[:5]))
+        assert set(sku_sets[0] & sku_sets[pairs]) == frozensets[0] & frozensets[pairs]
+
+        frozen_bytes = sum(map(sys.getsizeof, frozensets)) / len(frozensets)
+        bitset_bytes = sum(sys.getsizeof(s._bits) for s in sku_sets) / len(sku_sets)
+        print(f"  density {density:6.1%}: ops/sec " + ", ".join(
+            f"{op} {timings['frozenset', op]:>9,.0f} -> {timings['SkuSet', op]:>9,.0f}" for op in "&|-")
+            + f" | bytes/set {frozen_bytes:>9,.0f} -> {bitset_bytes:>7,.0f}"
+            + f" | build {build_time * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    universe = SkuUniverse()
+    inventory_items = universe.set_of(["apple", "banana", "orange"])
+    print(f"Original inventory items: {inventory_items}")
+    try:
+        inventory_items.add("pear")
+    except AttributeError as e:
+        print(e)
+
+    fruit_in_stock = universe.set_of(["banana", "pear"])
+    print(inventory_items & fruit_in_stock, inventory_items | fruit_in_stock,
+          inventory_items - fruit_in_stock, "apple" in inventory_items)
+    print(universe.intern(universe.set_of(["apple"])) is universe.intern(universe.set_of(["apple"])))
+    benchmark()
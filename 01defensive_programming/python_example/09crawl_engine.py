@@ -0,0 +1,384 @@
+
+# Async Crawl Engine: fetch_and_parse_title/main in 06immutable_data.py and
+# fetch_and_parse/main in 09miniproject.py fetch pages with blocking
+# requests.get on a ThreadPoolExecutor of 3-5 workers, so at most 3-5 pages are
+# ever in flight, and each page is parsed with BeautifulSoup just to read <title>.
+#
+# CrawlEngine runs every fetch as an asyncio task on one thread:
+# - a global limit on connections in flight (thousands are fine)
+# - a per-host connection limit and an optional politeness delay between
+#   requests to the same host
+# - a timeout per request and an optional deadline for the whole crawl
+# - one CrawlResult per URL, in input order, whatever happened to it
+# The title is taken from the raw bytes with a precompiled regex; only the first
+# max_body bytes of each page are read, so thousands of concurrent fetches
+# cannot each buffer an arbitrarily large page. The fail-safe
+# strings are kept: "Failed to fetch" for a non-200 response and "Error: ..."
+# for anything that went wrong.
+
+import asyncio
+import codecs
+import html
+import importlib
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+
+async_api_call = importlib.import_module("02async_api_call")
+
+FAILED_TO_FETCH = "Failed to fetch"
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+TITLE_RE = re.compile(rb"<title[^>]*>(.*?)</title\s*>", re.IGNORECASE | re.DOTALL)
+
+URLS = (
+    "https://www.python.org",
+    "https://www.wikipedia.org",
+    "https://www.github.com"
+)
+
+
+# Example #1: Structured results
+
+class CrawlResult:
+    """What happened to one URL: a title, a non-200 status, or an error message."""
+    __slots__ = ("url", "status", "title", "error", "elapsed")
+
+    def __init__(self, url, status=None, title=None, error=None, elapsed=0.0):
+        self.url = url
+        self.status = status
+        self.title = title
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return self.title is not None
+
+    def summary(self):
+        """The title, or the fail-safe string the thread-pool versions returned."""
+        if self.title is not None:
+            return self.title
+        if self.error is None:
+            return FAILED_TO_FETCH
+        return f"Error: {self.error}"
+
+    def __repr__(self):
+        return f"CrawlResult({self.url!r}, status={self.status}, summary={self.summary()!r})"
+
+
+def extract_title(body, charset="utf-8"):
+    match = TITLE_RE.search(body)
+    if match is None:
+        return None
+    return html.unescape(match.group(1).decode(charset, errors="replace"))
+
+
+def _charset(headers):
+    content_type = headers.get("content-type", "")
+    _, _, charset = content_type.partition("charset=")
+    charset = charset.split(";")[0].strip().strip('"') or "utf-8"
+    # Fall back to utf-8 for unknown names, and for non-text codecs such as
+    # "rot13", which codecs.lookup accepts but bytes.decode rejects
+    try:
+        codecs.lookup(charset)
+        b"<".decode(charset, errors="replace")
+    except LookupError:
+        return "utf-8"
+    return charset
+
+
+# Example #2: The engine
+
+class _Host:
+    __slots__ = ("semaphore", "next_start")
+
+    def __init__(self, limit):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.next_start = 0.0
+
+
+class CrawlEngine:
+    def __init__(self, concurrency=1000, per_host=8, delay=0.0, timeout=10, max_redirects=5,
+                 max_body=256 * 1024):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.delay = delay
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self.max_body = max_body
+        self._global = None
+        self._hosts = {}
+
+    def _host(self, url):
+        netloc = urlsplit(url).netloc.lower()
+        host = self._hosts.get(netloc)
+        if host is None:
+            host = self._hosts[netloc] = _Host(self.per_host)
+        return host
+
+    async def _polite(self, host):
+        # Reserve the next start slot for this host without holding any lock;
+        # the event loop runs this synchronously up to the sleep
+        if self.delay <= 0:
+            return
+        now = asyncio.get_running_loop().time()
+        start = max(now, host.next_start)
+        host.next_start = start + self.delay
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def _request(self, url):
+        """One GET, under its host's connection limit and politeness delay."""
+        host = self._host(url)
+        # Wait for the host first, so URLs queued behind a busy host do not
+        # hold global slots that other hosts could use
+        async with host.semaphore:
+            async with self._global:
+                await self._polite(host)
+                return await asyncio.wait_for(
+                    async_api_call.http_request(url, accept="text/html", max_body=self.max_body),
+                    self.timeout)
+
+    async def fetch(self, url):
+        """Fetch one URL and return a CrawlResult; never raises for a bad URL or host.
+
+        Every redirect hop is a separate request that takes the limiter and
+        politeness slot of the host it goes to, so a redirect cannot bypass
+        another host's limits. The timeout applies to each hop.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        if self._global is None:
+            self._global = asyncio.Semaphore(self.concurrency)
+        target = url
+        try:
+            for _ in range(self.max_redirects + 1):
+                status, headers, body = await self._request(target)
+                if status not in REDIRECT_STATUSES or "location" not in headers:
+                    break
+                target = urljoin(target, headers["location"])
+            else:
+                raise async_api_call.RequestError(f"More than {self.max_redirects} redirects")
+        except asyncio.TimeoutError:
+            return CrawlResult(url, error=f"Request timed out after {self.timeout} seconds",
+                               elapsed=loop.time() - started)
+        except (OSError, async_api_call.RequestError, asyncio.IncompleteReadError, ValueError) as e:
+            return CrawlResult(url, error=str(e) or type(e).__name__, elapsed=loop.time() - started)
+
+        elapsed = loop.time() - started
+        if status != 200:
+            return CrawlResult(url, status, elapsed=elapsed)
+        title = extract_title(body, _charset(headers))
+        if title is None:
+            return CrawlResult(url, status, error="No <title> found", elapsed=elapsed)
+        return CrawlResult(url, status, title, elapsed=elapsed)
+
+    async def crawl(self, urls, deadline=None):
+        """Fetch every URL concurrently; one CrawlResult per URL, in input order.
+
+        URLs still unfinished after `deadline` seconds are cancelled and get an
+        error result.
+        """
+        tasks = [asyncio.ensure_future(self.fetch(url)) for url in urls]
+        if not tasks:
+            return []
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        return [task.result() if task in done
+                else CrawlResult(url, error=f"Crawl deadline of {deadline} seconds reached", elapsed=deadline)
+                for url, task in zip(urls, tasks)]
+
+
+# Example #3: The original entry points on top of the engine
+
+async def fetch_and_parse_title(url, engine=None):
+    """Async version of 06immutable_data.py: returns (url, title or fail-safe string)."""
+    result = await (engine or CrawlEngine()).fetch(url)
+    return url, result.summary()
+
+
+async def main(urls=URLS):
+    for result in await CrawlEngine().crawl(urls):
+        print(f"Title of {result.url}: {result.summary()}")
+
+
+def save_titles(results, path="titles.txt"):
+    with open(path, "w") as file:
+        for result in results:
+            if result.ok:
+                file.write(f"{result.title}\n")
+
+
+async def scrape(urls, path="titles.txt", timeout=5, deadline=None):
+    """09miniproject.py's main: fetch, report each URL, save the titles."""
+    start_time = time.time()
+    results = await CrawlEngine(timeout=timeout).crawl(urls, deadline)
+    for result in results:
+        if result.ok:
+            print(f"Title found: {result.title}")
+        elif result.error and result.error.startswith("Request timed out"):
+            print(f"Request timed out for {result.url}")
+        else:
+            print(f"Error fetching {result.url}: {result.summary()}")
+    save_titles(results, path)
+    print(f"Scrapping completed in {time.time() - start_time:.2f} seconds.")
+    return results
+
+
+# Example #4: Stub hosts serving synthetic HTML
+
+_FILLER = b"<p>" + b"Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 80 + b"</p>"
+
+
+async def _page_handler(reader, writer):
+    try:
+        request_line = await reader.readline()
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        parts = request_line.split()
+        path = parts[1].decode() if len(parts) > 1 else "/"
+        await asyncio.sleep(0.02)  # simulated network and server latency
+        status, extra, body, charset = "200 OK", b"", b"", "utf-8"
+        if path.startswith("/slow"):
+            await asyncio.sleep(30)
+        elif path.startswith("/missing"):
+            status = "404 Not Found"
+        elif path.startswith("/moved"):
+            status, extra = "302 Found", b"Location: /page/moved\r\n"
+        elif path.startswith("/redirect/"):
+            status, extra = "302 Found", b"Location: " + path[len("/redirect/"):].encode() + b"\r\n"
+        elif path.startswith("/loop"):
+            status, extra = "302 Found", b"Location: /loop\r\n"
+        elif path.startswith("/notitle"):
+            body = b"<html><body>" + _FILLER + b"</body></html>"
+        else:
+            if path.startswith("/badcharset"):
+                charset = "bogus"
+            body = (b"<!doctype html><html><head><meta charset='utf-8'><title>Synthetic page "
+                    + path.encode() + b" &amp; friends</title></head><body>" + _FILLER + b"</body></html>")
+            if path.startswith("/huge"):
+                body += _FILLER * 4000  # ~18 MB
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: text/html; charset={charset}\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n".encode() + extra + b"\r\n" + body)
+        await writer.drain()
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+class StubHosts:
+    """Run `count` stub HTTP servers on a background event loop thread."""
+
+    def __init__(self, count=4):
+        self.count = count
+        self.bases = []
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    def _handle(self, reader, writer):
+        task = asyncio.ensure_future(_page_handler(reader, writer))
+        self._handlers.add(task)
+        task.add_done_callback(self._handlers.discard)
+
+    async def _start(self):
+        self._handlers = set()
+        self._servers = [await asyncio.start_server(self._handle, "127.0.0.1", 0, backlog=4096)
+                         for _ in range(self.count)]
+        return [f"http://127.0.0.1:{s.sockets[0].getsockname()[1]}" for s in self._servers]
+
+    async def _stop(self):
+        for server in self._servers:
+            server.close()
+        # Connections still being served (the /slow pages) are not closed by close()
+        for task in list(self._handlers):
+            task.cancel()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        for server in self._servers:
+            await server.wait_closed()
+
+    def __enter__(self):
+        self._thread.start()
+        self.bases = asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return self
+
+    def __exit__(self, *exc):
+        asyncio.run_coroutine_threadsafe(self._stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+# Example #5: Benchmark, thread pool vs engine
+
+def _thread_pool_crawl(urls, workers=5):
+    # The approach of 06immutable_data.py: requests + BeautifulSoup on 5 threads
+    import requests
+    from bs4 import BeautifulSoup
+
+    def fetch(url):
+        try:
+            response = requests.get(url, timeout=5)
+            if response.status_code == 200:
+                return url, BeautifulSoup(response.content, "html.parser").find("title").text
+            return url, FAILED_TO_FETCH
+        except Exception as e:
+            return url, f"Error: {str(e)}"
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(fetch, urls))
+
+
+def benchmark(pages=5_000, baseline_pages=500):
+    with StubHosts(4) as hosts:
+        urls = [f"{hosts.bases[i % 4]}/page/{i}" for i in range(pages)]
+
+        start = time.perf_counter()
+        titles = _thread_pool_crawl(urls[:baseline_pages])
+        elapsed = time.perf_counter() - start
+        assert all(title.startswith("Synthetic page") for _, title in titles)
+        print(f"{'ThreadPoolExecutor(5) + requests':>40}: {baseline_pages / elapsed:8,.0f} pages/sec")
+
+        for concurrency, per_host in ((5, 5), (100, 25), (1000, 250), (4000, 1000)):
+            engine = CrawlEngine(concurrency=concurrency, per_host=per_host, timeout=30)
+            start = time.perf_counter()
+            results = asyncio.run(engine.crawl(urls))
+            elapsed = time.perf_counter() - start
+            failed = sum(not r.ok for r in results)
+            label = f"CrawlEngine({concurrency}, per_host={per_host})"
+            print(f"{label:>40}: {pages / elapsed:8,.0f} pages/sec, {failed} failed")
+
+        engine = CrawlEngine(concurrency=1000, per_host=250, delay=0.01)
+        start = time.perf_counter()
+        results = asyncio.run(engine.crawl(urls[:1000]))
+        elapsed = time.perf_counter() - start
+        print(f"{'with a 10 ms politeness delay per host':>40}: {1000 / elapsed:8,.0f} pages/sec "
+              f"(at most {4 / 0.01:,.0f} with 4 hosts)")
+
+
+async def demo(bases):
+    base, other = bases
+    engine = CrawlEngine(timeout=0.5)
+    urls = [f"{base}/page/1", f"{base}/missing", f"{base}/moved", f"{base}/loop", f"{base}/notitle",
+            f"{base}/badcharset", f"{base}/huge", f"{base}/slow", "http://127.0.0.1:1/refused", "not a url"]
+    for url, summary in await asyncio.gather(*(fetch_and_parse_title(url, engine) for url in urls)):
+        print(f"Title of {url}: {summary}")
+    print(await CrawlEngine().crawl([f"{base}/slow"] * 2, deadline=0.3))
+
+    # Redirects into another host wait for that host's politeness slot too
+    polite = CrawlEngine(per_host=1, delay=0.2)
+    start = time.perf_counter()
+    results = await polite.crawl([f"{other}/page/1"] + [f"{base}/redirect/{other}/page/{i}" for i in (2, 3)])
+    print(f"3 pages on one host via redirects, 0.2 s apart: {time.perf_counter() - start:.2f} s, "
+          f"{sum(r.ok for r in results)} ok")
+
+
+if __name__ == "__main__":
+    with StubHosts(2) as hosts:
+        asyncio.run(demo(hosts.bases))
+    benchmark()